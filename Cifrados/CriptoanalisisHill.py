@@ -0,0 +1,201 @@
+# Criptoanálisis de Hill (alfabeto de 27 con Ñ, MOD = 27)
+#  - Texto claro conocido: K = C · P^(-1) mod 27 con n pares de bloques.
+#  - Solo texto cifrado 2×2: recorre las 27^4 matrices de descifrado en lotes de NumPy
+#    y puntúa cada texto con bigramas.
+#  - Solo texto cifrado n×n (3×3): cada fila de K^(-1) produce por sí sola una letra de cada
+#    bloque, así que se puntúan las 27^n filas por separado (en varios procesos) y se combinan
+#    las mejores.
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import combinations, islice, permutations
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from Hill import MOD, arreglo_a_texto, inv_matriz, texto_a_arreglo
+from lib.matriz_modular import inv_matriz_mod, mult_mod
+from lib.traza import TrazaConsola, emitir, usar_traza
+
+# Texto de referencia para el modelo por defecto (español; solo se usan sus letras)
+_CORPUS_ES = """
+La criptografía estudia cómo proteger la información para que solo la lean quienes tienen
+la clave. Durante siglos los mensajes se cifraron a mano, sustituyendo unas letras por otras
+o cambiando su orden, y los analistas aprendieron a romperlos contando con paciencia cuántas
+veces aparece cada letra. En español la letra más frecuente es la E, seguida de la A, la O y
+la S; también son muy comunes las parejas DE, EN, EL, LA, QUE, ES, OS y AS. El cifrado de
+Hill, propuesto en mil novecientos veintinueve, fue uno de los primeros en mezclar varias
+letras a la vez mediante una matriz, de modo que una misma letra del mensaje no siempre se
+convierte en la misma letra del texto cifrado. Aun así, el método es lineal y por eso cae
+ante quien conoce algunos fragmentos del mensaje original, porque basta resolver un sistema
+de ecuaciones modulares para recuperar la clave completa. Cuando solo se dispone del texto
+cifrado, el analista puede probar claves y quedarse con aquella cuyo resultado se parezca más
+al idioma esperado, midiendo la frecuencia de las letras y de las parejas de letras. Con
+computadoras modernas esta búsqueda es rápida para matrices pequeñas, y la lección sigue
+vigente: un buen sistema de cifrado debe resistir incluso cuando el enemigo conoce el método
+y dispone de mucho texto cifrado. Por esa razón los estudiantes repiten estos ejercicios en
+clase, calculan determinantes, buscan inversos modulares y comprueban que la matriz elegida
+tenga un determinante sin factores comunes con el tamaño del alfabeto.
+"""
+
+class ModeloNgramas(NamedTuple):
+    frecuencias: np.ndarray  # P(letra), (27,)
+    bigramas: np.ndarray     # log P(a, b), (27, 27)
+
+def modelo_ngramas(corpus: str) -> ModeloNgramas:
+    """Frecuencias de letras y log-probabilidades de bigramas (suavizado +1) de un corpus."""
+    nums = texto_a_arreglo(corpus).astype(np.intp)
+    uni = np.bincount(nums, minlength=MOD) + 1.0
+    bi = np.ones((MOD, MOD))
+    np.add.at(bi, (nums[:-1], nums[1:]), 1.0)
+    return ModeloNgramas(uni / uni.sum(), np.log(bi / bi.sum()))
+
+@lru_cache(maxsize=1)
+def modelo_espanol() -> ModeloNgramas:
+    return modelo_ngramas(_CORPUS_ES)
+
+def puntuar_texto(nums: np.ndarray, modelo: ModeloNgramas) -> float:
+    """Log-verosimilitud de bigramas (mayor = más parecido al idioma)."""
+    nums = np.asarray(nums, dtype=np.intp)
+    return float(modelo.bigramas[nums[:-1], nums[1:]].sum())
+
+class CandidatoHill(NamedTuple):
+    puntaje: float
+    clave: List[List[int]]  # K de cifrado
+    texto: str
+
+def _bloques_cifrados(cifrado: str, n: int, max_bloques: Optional[int]) -> np.ndarray:
+    """Matriz n×m con los bloques del cifrado como columnas."""
+    c = texto_a_arreglo(cifrado)
+    m = len(c) // n
+    if max_bloques is not None:
+        m = min(m, max_bloques)
+    if m < 2:
+        raise ValueError("Texto cifrado demasiado corto")
+    return c[:m * n].reshape(m, n).T.astype(np.int64)
+
+def _todas_las_filas(n: int) -> np.ndarray:
+    """Las 27^n filas posibles, (27^n × n)."""
+    return np.indices((MOD,) * n).reshape(n, -1).T.astype(np.int64)
+
+def _candidato(D: np.ndarray, cifrado: str, puntaje: float) -> CandidatoHill:
+    """D = K^(-1): devuelve K y el descifrado completo."""
+    D = D.tolist()
+    c = texto_a_arreglo(cifrado)
+    n = len(D)
+    c = c[:len(c) // n * n].reshape(-1, n).astype(np.int64)
+    texto = arreglo_a_texto(((c @ np.array(D).T) % MOD).reshape(-1))
+    return CandidatoHill(puntaje, inv_matriz(D), texto)
+
+# --- texto claro conocido ---
+def clave_por_texto_conocido(claro: str, cifrado: str, n: int, max_intentos: int = 20_000) -> List[List[int]]:
+    """
+    Recupera K (n×n) a partir de texto claro y su cifrado, alineados desde el inicio de un bloque.
+    Busca n bloques cuyo P (bloques como columnas) sea invertible mod 27 y resuelve K = C·P^(-1);
+    la clave se comprueba contra todos los bloques conocidos.
+    """
+    p, c = texto_a_arreglo(claro), texto_a_arreglo(cifrado)
+    m = min(len(p), len(c)) // n
+    if m < n:
+        raise ValueError("Hacen falta al menos n bloques completos de texto conocido")
+    Pb = p[:m * n].reshape(m, n).astype(np.int64)
+    Cb = c[:m * n].reshape(m, n).astype(np.int64)
+    emitir("1) Texto conocido: {m} pares de bloques de tamaño {n}", m=m, n=n)
+    for indices in islice(combinations(range(m), n), max_intentos):
+        P = Pb[list(indices)].T.tolist()
+        try:
+            P_inv = inv_matriz_mod(P, MOD)
+        except ValueError:
+            continue
+        K = mult_mod(Cb[list(indices)].T.tolist(), P_inv, MOD)
+        if ((Pb @ np.array(K).T) % MOD == Cb).all():
+            emitir("   Bloques {idx}: P invertible → K = C·P^(-1) mod {mod} = {K}", idx=indices, mod=MOD, K=K)
+            return K
+    raise ValueError("No se encontró una clave Hill coherente con el texto conocido")
+
+# --- solo texto cifrado, 2×2 exhaustivo ---
+def buscar_clave_2x2(cifrado: str, modelo: Optional[ModeloNgramas] = None, mejores: int = 5,
+                     max_bloques: Optional[int] = 300) -> List[CandidatoHill]:
+    """
+    Prueba las 27^4 matrices D = K^(-1). Con filas r_i, r_j de D, el texto es
+    y_i[0] y_j[0] y_i[1] y_j[1] ..., así que la puntuación de bigramas de cada par (i, j) sale
+    de consultas en la tabla sobre los 729 vectores y_i = r_i·C precalculados.
+    """
+    modelo = modelo or modelo_espanol()
+    C = _bloques_cifrados(cifrado, 2, max_bloques)
+    filas = _todas_las_filas(2)
+    Y = (filas @ C) % MOD                        # (729 × m)
+    B = modelo.bigramas
+    puntajes = np.empty((len(filas), len(filas)))
+    for i, y_i in enumerate(Y):
+        dentro = B[y_i[None, :], Y].sum(axis=1)             # (y_i[k], y_j[k])
+        entre = B[Y[:, :-1], y_i[None, 1:]].sum(axis=1)     # (y_j[k], y_i[k+1])
+        puntajes[i] = dentro + entre
+    # D = [[a_i, b_i], [a_j, b_j]] solo sirve si det no es múltiplo de 3
+    a, b = filas[:, 0], filas[:, 1]
+    det = a[:, None] * b[None, :] - b[:, None] * a[None, :]
+    puntajes[det % 3 == 0] = -np.inf
+    orden = np.argsort(puntajes, axis=None)[::-1][:mejores]
+    emitir("1) Búsqueda exhaustiva 2×2: {k} matrices puntuadas", k=puntajes.size)
+    return [_candidato(filas[[i, j]], cifrado, float(puntajes[i, j]))
+            for i, j in zip(*np.unravel_index(orden, puntajes.shape))]
+
+# --- solo texto cifrado, fila a fila (3×3) ---
+def _chi2_filas(filas: np.ndarray, C: np.ndarray, esperadas: np.ndarray) -> np.ndarray:
+    """χ² de las letras que produce cada fila candidata (menor = más parecido al idioma)."""
+    Y = (filas @ C) % MOD
+    desplazados = Y + MOD * np.arange(len(filas))[:, None]
+    cuentas = np.bincount(desplazados.ravel(), minlength=len(filas) * MOD).reshape(len(filas), MOD)
+    esperado = esperadas * C.shape[1]
+    return (((cuentas - esperado) ** 2) / esperado).sum(axis=1)
+
+def buscar_clave_por_filas(cifrado: str, n: int = 3, modelo: Optional[ModeloNgramas] = None,
+                           candidatas: int = 10, mejores: int = 5, procesos: Optional[int] = None,
+                           max_bloques: Optional[int] = 400) -> List[CandidatoHill]:
+    """
+    Ataque fila a fila: las 27^n filas se reparten entre `procesos` y se puntúan con χ²
+    de frecuencias; con las `candidatas` mejores se prueban todas las D ordenadas
+    (invertibles) y se puntúa el texto completo con bigramas.
+    """
+    modelo = modelo or modelo_espanol()
+    C = _bloques_cifrados(cifrado, n, max_bloques)
+    filas = _todas_las_filas(n)
+    trozos = np.array_split(filas, 4 * (procesos or 1))
+    if procesos == 1:
+        chi2 = np.concatenate([_chi2_filas(t, C, modelo.frecuencias) for t in trozos])
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            chi2 = np.concatenate(list(pool.map(partial(_chi2_filas, C=C, esperadas=modelo.frecuencias), trozos)))
+    elegidas = filas[np.argsort(chi2)[:candidatas]]
+    emitir("1) Filas puntuadas: {k}; se combinan las {c} mejores", k=len(filas), c=candidatas)
+
+    resultados = []
+    for combo in permutations(range(len(elegidas)), n):
+        D = elegidas[list(combo)]
+        try:
+            inv_matriz_mod(D.tolist(), MOD)
+        except ValueError:
+            continue
+        texto = ((D @ C) % MOD).T.reshape(-1)
+        resultados.append((puntuar_texto(texto, modelo), combo))
+    resultados.sort(reverse=True)
+    return [_candidato(elegidas[list(combo)], cifrado, puntaje) for puntaje, combo in resultados[:mejores]]
+
+# --- demo breve ---
+if __name__ == "__main__":
+    from Hill import cifrar_hill_vectorizado
+    usar_traza(TrazaConsola())
+    print("=== Criptoanálisis de Hill ===")
+    mensaje = ("El analista recibe un mensaje cifrado y sospecha que se uso el metodo de Hill con una "
+               "matriz pequeña. Cuenta las letras, prueba todas las claves posibles y se queda con la "
+               "que produce un texto con las parejas de letras mas habituales del español, como "
+               "de, en, la, es y que. Al final recupera la clave y puede leer el resto de la correspondencia.")
+    K2 = [[3, 2], [5, 7]]
+    C2 = cifrar_hill_vectorizado(K2, mensaje)
+    print(f"   K (2×2) recuperada con texto conocido: {clave_por_texto_conocido(mensaje[:20], C2, 2)}")
+    mejor = buscar_clave_2x2(C2)[0]
+    print(f"   K (2×2) por búsqueda exhaustiva: {mejor.clave} → {mejor.texto[:40]}...")
+    K3 = [[1, 2, 3], [0, 1, 4], [5, 6, 0]]
+    C3 = cifrar_hill_vectorizado(K3, mensaje)
+    mejor = buscar_clave_por_filas(C3, 3)[0]
+    print(f"   K (3×3) fila a fila: {mejor.clave} → {mejor.texto[:40]}...")
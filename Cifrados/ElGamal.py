@@ -1,86 +1,160 @@
 # ElGamal paso x paso con "mini sustitución" y nombres descriptivos
-from random import Random, randrange
+from functools import partial
 
+from lib.aleatorio import randrange
+from lib.aritmetica_modular import inverso_modular, inversos_en_lote
+from lib.exponenciacion import potencia_base_fija
+from lib.flujo_bloques import FormatoBloques, anchos_para_modulo, cifrar_flujo, descifrar_flujo
 from lib.generador_primos import primo_ndigitos
-
-# --- utilidades ---
-def inverso_modular(valor, primo_modulo):
-    """Devuelve x tal que valor*x ≡ 1 (mod primo_modulo)."""
-    try:
-        return pow(valor, -1, primo_modulo)  # Python 3.8+
-    except TypeError:
-        # Euclides extendido
-        def egcd(x,b): 
-            return (x,1,0) if b==0 else (lambda g,x,y:(g,y,x-(x//b)*y))(*egcd(b,x%b))
-        g,x,_ = egcd(valor, primo_modulo)
-        assert g == 1, "No hay inverso (valor y primo no coprimos)"
-        return x % primo_modulo
+from lib.grupos import generar_grupo_seguro, proponer_generador_aleatorio
+from lib.precalculo import PoolPrecalculo, RegistroPools
+from lib.traza import TrazaConsola, con_traza, emitir, usar_traza
 
 # --- generación de claves ---
 def generar_claves(primo_modulo, generador_g):
-    print("1) Parámetros del grupo: primo p y generador g.")
-    print(f"   p = {primo_modulo}, g = {generador_g}")
+    emitir("1) Parámetros del grupo: primo p y generador g.")
+    emitir("   p = {p}, g = {g}", p=primo_modulo, g=generador_g)
     exponente_privado_x = randrange(1, primo_modulo-1)
-    print("2) Elegir exponente privado x ∈ [1, p-2].")
-    print(f"   x = {exponente_privado_x}  (SECRETO)")
-    componente_publica_y = pow(generador_g, exponente_privado_x, primo_modulo)
-    print("3) Calcular y = g^x mod p (parte pública).")
-    print(f"   y = {generador_g}^{exponente_privado_x} mod {primo_modulo} = {componente_publica_y}")
-    print(f"   Clave pública: (p,g,y) = ({primo_modulo},{generador_g},{componente_publica_y}). Clave privada: x = {exponente_privado_x}.")
+    emitir("2) Elegir exponente privado x ∈ [1, p-2].")
+    emitir("   x = {x}  (SECRETO)", x=exponente_privado_x)
+    componente_publica_y = potencia_base_fija(generador_g, exponente_privado_x, primo_modulo)
+    emitir("3) Calcular y = g^x mod p (parte pública).")
+    emitir("   y = {g}^{x} mod {p} = {y}", g=generador_g, x=exponente_privado_x, p=primo_modulo, y=componente_publica_y)
+    emitir("   Clave pública: (p,g,y) = ({p},{g},{y}). Clave privada: x = {x}.",
+           p=primo_modulo, g=generador_g, y=componente_publica_y, x=exponente_privado_x)
     clave_publica = (primo_modulo, generador_g, componente_publica_y)
     return clave_publica, exponente_privado_x
 
 # --- cifrado ---
 def cifrar_mensaje(clave_publica, mensaje_m):
     primo_modulo, generador_g, componente_publica_y = clave_publica
-    print("4) CIFRADO del mensaje m (0 < m < p).")
-    print(f"   m = {mensaje_m}")
+    emitir("4) CIFRADO del mensaje m (0 < m < p).")
+    emitir("   m = {m}", m=mensaje_m)
     exponente_efimero_k = randrange(1, primo_modulo-1)
-    print("   Elegir k aleatorio efímero ≠ 0.")
-    print(f"   k = {exponente_efimero_k}")
-    cifrado_parte_c1 = pow(generador_g, exponente_efimero_k, primo_modulo)
-    print(f"   c1 = g^k mod p = {generador_g}^{exponente_efimero_k} mod {primo_modulo} = {cifrado_parte_c1}")
-    h_elevado_k = pow(componente_publica_y, exponente_efimero_k, primo_modulo)
-    print(f"   y^k = ({componente_publica_y})^{exponente_efimero_k} mod {primo_modulo} = {h_elevado_k}")
+    emitir("   Elegir k aleatorio efímero ≠ 0.")
+    emitir("   k = {k}", k=exponente_efimero_k)
+    # g (y la y de una clave que se repite) usan tabla de base fija; una y puntual, pow()
+    cifrado_parte_c1 = potencia_base_fija(generador_g, exponente_efimero_k, primo_modulo)
+    emitir("   c1 = g^k mod p = {g}^{k} mod {p} = {c1}", g=generador_g, k=exponente_efimero_k, p=primo_modulo, c1=cifrado_parte_c1)
+    h_elevado_k = potencia_base_fija(componente_publica_y, exponente_efimero_k, primo_modulo)
+    emitir("   y^k = ({y})^{k} mod {p} = {yk}", y=componente_publica_y, k=exponente_efimero_k, p=primo_modulo, yk=h_elevado_k)
+    cifrado_parte_c2 = (mensaje_m * h_elevado_k) % primo_modulo
+    emitir("   c2 = m * y^k mod p = {m} * {yk} mod {p} = {c2}", m=mensaje_m, yk=h_elevado_k, p=primo_modulo, c2=cifrado_parte_c2)
+    emitir("   Texto cifrado: C = (c1, c2) = ({c1}, {c2})", c1=cifrado_parte_c1, c2=cifrado_parte_c2)
+    return (cifrado_parte_c1, cifrado_parte_c2)
+
+# --- cifrado con pares efímeros precalculados (fase offline / online) ---
+def par_efimero(clave_publica):
+    """Fase offline: k nuevo y el par (g^k, y^k) mod p; k no se guarda."""
+    primo_modulo, generador_g, componente_publica_y = clave_publica
+    k = randrange(1, primo_modulo-1)
+    return (potencia_base_fija(generador_g, k, primo_modulo),
+            potencia_base_fija(componente_publica_y, k, primo_modulo))
+
+MAX_POOLS_EFIMEROS = 8  # claves con pool vivo a la vez; la menos usada se detiene
+_pools_efimeros = RegistroPools(MAX_POOLS_EFIMEROS)
+
+def pool_efimero(clave_publica, capacidad=256):
+    """
+    Pool de pares (g^k, y^k) de una clave pública; se crea y arranca una vez por clave.
+    Hay a lo sumo MAX_POOLS_EFIMEROS pools vivos: al pasar de ahí se detiene el menos usado
+    (su hilo termina y sus pares se descartan); cerrar_pools_efimeros() los detiene antes.
+    """
+    clave_publica = tuple(clave_publica)
+    return _pools_efimeros.obtener(clave_publica, lambda: PoolPrecalculo(lambda: par_efimero(clave_publica), capacidad))
+
+def cerrar_pools_efimeros(clave_publica=None):
+    """Detiene el pool de clave_publica (o todos con None) y descarta sus pares."""
+    if clave_publica is None:
+        _pools_efimeros.cerrar_todos()
+    else:
+        _pools_efimeros.cerrar(tuple(clave_publica))
+
+def cifrar_mensaje_precalculado(clave_publica, mensaje_m, pool=None):
+    """Fase online: un par del pool (nunca reutilizado) y una sola multiplicación modular."""
+    primo_modulo = clave_publica[0]
+    pool = pool or pool_efimero(clave_publica)
+    cifrado_parte_c1, h_elevado_k = pool.tomar()
     cifrado_parte_c2 = (mensaje_m * h_elevado_k) % primo_modulo
-    print(f"   c2 = m * y^k mod p = {mensaje_m} * {h_elevado_k} mod {primo_modulo} = {cifrado_parte_c2}")
-    print(f"   Texto cifrado: C = (c1, c2) = ({cifrado_parte_c1}, {cifrado_parte_c2})")
+    emitir("   C = (c1, m * y^k mod p) con par precalculado = ({c1}, {c2})", c1=cifrado_parte_c1, c2=cifrado_parte_c2)
     return (cifrado_parte_c1, cifrado_parte_c2)
 
+# --- descifrado de listas (sin traza por mensaje) ---
+def descifrar_mensajes(clave_publica, exponente_privado_x, textos_cifrados):
+    """Descifra una lista de (c1, c2): todos los s^(-1) salen de una sola inversión (truco de Montgomery)."""
+    primo_modulo = clave_publica[0]
+    textos_cifrados = list(textos_cifrados)
+    secretos = [pow(c1, exponente_privado_x, primo_modulo) for c1, _ in textos_cifrados]
+    inversos = inversos_en_lote(secretos, primo_modulo)
+    emitir("   Lote: {k} mensajes descifrados con una sola inversión modular", k=len(textos_cifrados))
+    return [(c2 * s_inv) % primo_modulo for (_, c2), s_inv in zip(textos_cifrados, inversos)]
+
 # --- descifrado ---
 def descifrar_mensaje(clave_publica, exponente_privado_x, texto_cifrado_C):
     primo_modulo, generador_g, componente_publica_y = clave_publica
     cifrado_parte_c1, cifrado_parte_c2 = texto_cifrado_C
-    print("5) DESCIFRADO con la privada x.")
-    print(f"   Recibido C = (c1,c2) = ({cifrado_parte_c1}, {cifrado_parte_c2})")
+    emitir("5) DESCIFRADO con la privada x.")
+    emitir("   Recibido C = (c1,c2) = ({c1}, {c2})", c1=cifrado_parte_c1, c2=cifrado_parte_c2)
     secreto_compartido_s = pow(cifrado_parte_c1, exponente_privado_x, primo_modulo)
-    print(f"   s = c1^x mod p = {cifrado_parte_c1}^{exponente_privado_x} mod {primo_modulo} = {secreto_compartido_s}")
+    emitir("   s = c1^x mod p = {c1}^{x} mod {p} = {s}", c1=cifrado_parte_c1, x=exponente_privado_x, p=primo_modulo, s=secreto_compartido_s)
     inverso_de_s = inverso_modular(secreto_compartido_s, primo_modulo)
-    print(f"   s^(-1) mod p = inv({secreto_compartido_s}, {primo_modulo}) = {inverso_de_s}")
+    emitir("   s^(-1) mod p = inv({s}, {p}) = {s_inv}", s=secreto_compartido_s, p=primo_modulo, s_inv=inverso_de_s)
 
     # --- MINI SUSTITUCIÓN ANTES DE LA RESPUESTA FINAL ---
     # Mostramos explícitamente la operación de recuperación:
-    print("   (Mini sustitución) m = c2 * s^(-1) mod p")
-    print(f"                     m = {cifrado_parte_c2} * {inverso_de_s} mod {primo_modulo}")
+    emitir("   (Mini sustitución) m = c2 * s^(-1) mod p")
+    emitir("                     m = {c2} * {s_inv} mod {p}", c2=cifrado_parte_c2, s_inv=inverso_de_s, p=primo_modulo)
 
     mensaje_recuperado = (cifrado_parte_c2 * inverso_de_s) % primo_modulo
-    print(f"   Resultado: m = {mensaje_recuperado}\n")
+    emitir("   Resultado: m = {m}\n", m=mensaje_recuperado)
     return mensaje_recuperado
 
-# --- propuesta g ---
-def proponer_generador_aleatorio(primo_p, semilla=None):
-    """Proponer un generador aleatorio g para el grupo multiplicativo Z/pZ."""
-    rng = Random(semilla)
-    while True:
-        g = rng.randrange(2, primo_p)
-        if pow(g, (primo_p - 1) // 2, primo_p) != 1:
-            return g
-        # Si no es generador, probamos con otro
-        continue
-    
+# --- cifrado de flujos de bytes por bloques ---
+def formato_elgamal(primo_modulo):
+    return FormatoBloques(b"EGM1", *anchos_para_modulo(primo_modulo), 2)
+
+def _cifrar_bloques_elgamal(clave_publica, bloques):
+    primo_modulo = clave_publica[0]
+    cifrados = []
+    for m in bloques:
+        cifrado_parte_c1, h_elevado_k = par_efimero(clave_publica)  # k nuevo por bloque
+        cifrados += (cifrado_parte_c1, (m * h_elevado_k) % primo_modulo)
+    return cifrados
+
+def _descifrar_bloques_elgamal(clave_publica, exponente_privado_x, bloques):
+    with con_traza(None):  # sin traza por trama (tampoco en los procesos hijos)
+        return descifrar_mensajes(clave_publica, exponente_privado_x, zip(bloques[0::2], bloques[1::2]))
+
+def cifrar_elgamal_flujo(clave_publica, entrada, salida, procesos=1, tam_trozo=1 << 16):
+    """
+    Cifra bytes arbitrarios (ruta o archivo binario) en bloques de (bits(p)-1)//8 bytes; cada
+    bloque se guarda como (c1, c2) dentro de tramas de longitud. Devuelve bytes escritos.
+    """
+    return cifrar_flujo(formato_elgamal(clave_publica[0]), partial(_cifrar_bloques_elgamal, tuple(clave_publica)),
+                        entrada, salida, tam_trozo, procesos)
+
+def descifrar_elgamal_flujo(clave_publica, exponente_privado_x, entrada, salida, procesos=1):
+    """Descifra en streaming un flujo de cifrar_elgamal_flujo."""
+    return descifrar_flujo(formato_elgamal(clave_publica[0]),
+                           partial(_descifrar_bloques_elgamal, tuple(clave_publica), exponente_privado_x),
+                           entrada, salida, procesos)
+
+# --- grupo con primo seguro y generador comprobado ---
+def generar_grupo_primo_seguro(n_bits, semilla=None, subgrupo=False, procesos=1, ruta_cache=None):
+    """p = 2q+1 seguro (criba combinada) y g comprobado: generador de Z_p* o, con subgrupo=True, de orden q."""
+    grupo = generar_grupo_seguro(n_bits, semilla, subgrupo=subgrupo, procesos=procesos, ruta_cache=ruta_cache)
+    emitir("   Grupo: p = 2q+1 = {p} (seguro), g = {g} de orden {orden}", p=grupo.p, g=grupo.g, orden=grupo.orden)
+    return grupo.p, grupo.g
+
+# --- parámetros desde el pool de primos precalculados ---
+def generar_grupo_desde_pool(pool, semilla=None):
+    """Toma p de un PoolPrimos y propone g; evita la búsqueda del primo en línea."""
+    primo_p = pool.tomar()
+    return primo_p, proponer_generador_aleatorio(primo_p, semilla)
 
 # --- demo breve ---
 if __name__ == "__main__":
+    usar_traza(TrazaConsola())
     print("=== ElGamal paso x paso (con mini sustitución) ===")
     # Primo pequeño y generador para demo de examen
     primo_p = primo_ndigitos(4, semilla=2026)
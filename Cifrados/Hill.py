@@ -1,86 +1,56 @@
-# Método de Hill (2×2 y 3×3) — paso a paso con "mini sustitución"
+# Método de Hill (n×n) — paso a paso con "mini sustitución"
 # Alfabeto con Ñ: A=0, B=1, ..., N=13, Ñ=14, O=15, ..., Z=26  → MOD = 27
-# Mensajes se empaquetan como matriz n×c (n=2 o 3). Padding con 0 (letra 'A').
+# Mensajes se empaquetan como matriz n×c. Padding con 0 (letra 'A').
+# Para textos grandes y n arbitrario: motor vectorizado con NumPy (cifrar_hill_vectorizado).
 
-from typing import List, Tuple
-from math import gcd
+import codecs
+import os
+from functools import lru_cache
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, TextIO, Tuple, Union
 
-ALFABETO = "ABCDEFGHIJKLMNÑOPQRSTUVWXYZ"  # 27 símbolos
-MOD = len(ALFABETO)  # 27
-MAP = {ch: i for i, ch in enumerate(ALFABETO)}
+import numpy as np
 
-# === Utilidades de texto ===
+from lib.alfabeto import ALFABETO_ES, CodecAlfabeto
+from lib.aritmetica_modular import inverso_modular
+from lib.matriz_modular import inv_matriz_mod  # Gauss–Jordan mod m (módulos compuestos)
+from lib.traza import TrazaConsola, emitir, traza_activa, usar_traza
+
+CODEC = CodecAlfabeto(ALFABETO_ES, relleno="A")  # códec compartido (lib/alfabeto.py)
+ALFABETO = CODEC.simbolos  # 27 símbolos
+MOD = CODEC.modulo  # 27
+MAP = CODEC.mapa
+RELLENO = CODEC.indice_relleno  # 0 ('A')
+
+# === Utilidades de texto (conversión en bloque con las tablas del códec) ===
 def normalizar_texto(t: str) -> str:
-    t = t.upper().replace("Ñ", "Ñ")  # asegurar mayúscula; se preserva la Ñ
-    # filtrar solo letras del alfabeto definido
-    return "".join(c for c in t if c in ALFABETO)
+    # mayúsculas y filtrar solo letras del alfabeto definido (se preserva la Ñ)
+    return CODEC.filtrar(t)
 
 def letras_a_numeros(t: str) -> List[int]:
-    return [MAP[c] for c in t]
+    return CODEC.codificar_lista(t)
 
 def numeros_a_letras(nums: List[int]) -> str:
-    return "".join(ALFABETO[n % MOD] for n in nums)
+    return CODEC.decodificar(nums)
+
+def texto_a_arreglo(t: str) -> np.ndarray:
+    """normalizar_texto + letras_a_numeros de una sola pasada (uint8)."""
+    return np.frombuffer(CODEC.codificar(t), dtype=np.uint8)
+
+def arreglo_a_texto(nums: np.ndarray) -> str:
+    """Inversa de texto_a_arreglo (equivale a numeros_a_letras)."""
+    return CODEC.decodificar((np.asarray(nums) % MOD).astype(np.uint8).tobytes())
 
 # === Utilidades de matrices modulares ===
-def mod_inv(a: int, m: int) -> int:
-    a %= m
-    # inverso modular por búsqueda (m es pequeño: 27)
-    for x in range(1, m):
-        if (a * x) % m == 1:
-            return x
-    raise ValueError("No existe inverso modular (no coprimo)")
-
-def det2(K: List[List[int]]) -> int:
-    return (K[0][0]*K[1][1] - K[0][1]*K[1][0]) % MOD
-
-def adj2(K: List[List[int]]) -> List[List[int]]:
-    return [[ K[1][1] % MOD, (-K[0][1]) % MOD],
-            [(-K[1][0]) % MOD,  K[0][0] % MOD]]
-
-def det3(K: List[List[int]]) -> int:
-    a,b,c = K[0]
-    d,e,f = K[1]
-    g,h,i = K[2]
-    return (a*(e*i - f*h) - b*(d*i - f*g) + c*(d*h - e*g)) % MOD
-
-def adj3(K: List[List[int]]) -> List[List[int]]:
-    a,b,c = K[0]
-    d,e,f = K[1]
-    g,h,i = K[2]
-    C00 =  (e*i - f*h)
-    C01 = -(d*i - f*g)
-    C02 =  (d*h - e*g)
-    C10 = -(b*i - c*h)
-    C11 =  (a*i - c*g)
-    C12 = -(a*h - b*g)
-    C20 =  (b*f - c*e)
-    C21 = -(a*f - c*d)
-    C22 =  (a*e - b*d)
-    # adj = cofactores transpuestos
-    return [[C00 % MOD, C10 % MOD, C20 % MOD],
-            [C01 % MOD, C11 % MOD, C21 % MOD],
-            [C02 % MOD, C12 % MOD, C22 % MOD]]
+mod_inv = inverso_modular  # inverso escalar compartido (lib.aritmetica_modular)
+
+@lru_cache(maxsize=256)
+def _inv_matriz_cacheada(K: Tuple[Tuple[int, ...], ...], mod: int) -> Tuple[Tuple[int, ...], ...]:
+    return tuple(map(tuple, inv_matriz_mod(K, mod)))
 
 def inv_matriz(K: List[List[int]]) -> List[List[int]]:
-    n = len(K)
-    if any(len(row) != n for row in K):
-        raise ValueError("K debe ser cuadrada")
-    if n == 2:
-        d = det2(K)
-        if gcd(d, MOD) != 1:
-            raise ValueError("K no invertible mod 27 (det no coprimo)")
-        d_inv = mod_inv(d, MOD)
-        A = adj2(K)
-        return [[(d_inv*A[i][j]) % MOD for j in range(2)] for i in range(2)]
-    elif n == 3:
-        d = det3(K)
-        if gcd(d, MOD) != 1:
-            raise ValueError("K no invertible mod 27 (det no coprimo)")
-        d_inv = mod_inv(d, MOD)
-        A = adj3(K)
-        return [[(d_inv*A[i][j]) % MOD for j in range(3)] for i in range(3)]
-    else:
-        raise ValueError("Solo se admite 2×2 o 3×3 en esta demo")
+    """K^(-1) mod 27 para cualquier n×n; las inversas se guardan en una caché LRU por clave."""
+    clave = tuple(tuple(int(x) % MOD for x in fila) for fila in K)
+    return [list(fila) for fila in _inv_matriz_cacheada(clave, MOD)]
 
 def mat_mul(A: List[List[int]], B: List[List[int]]) -> List[List[int]]:
     # A: (n×n), B: (n×c)
@@ -100,7 +70,7 @@ def vector_a_matriz(vec: List[int], n: int) -> List[List[int]]:
     v = vec[:]
     resto = len(v) % n
     if resto:
-        v.extend([0]*(n - resto))  # padding con 0 ('A')
+        v.extend([RELLENO]*(n - resto))  # padding con 0 ('A')
     c = len(v)//n
     M = [[0]*c for _ in range(n)]
     idx = 0
@@ -122,48 +92,193 @@ def matriz_a_vector(M: List[List[int]]) -> List[int]:
 # === Cifrado / Descifrado con "mini sustitución" ===
 def cifrar_hill(K: List[List[int]], mensaje: str) -> str:
     n = len(K)
-    print(f"1) CIFRADO — usar bloques de tamaño n={n} con padding 0 (A). MOD={MOD}")
+    emitir("1) CIFRADO — usar bloques de tamaño n={n} con padding 0 (A). MOD={mod}", n=n, mod=MOD)
     limpio = normalizar_texto(mensaje)
     v = letras_a_numeros(limpio)
     P = vector_a_matriz(v, n)
-    print(f"   Texto limpio: '{limpio}' → {v}")
-    print(f"   Matriz del mensaje P (n×c): {n}×{len(P[0])}")
+    emitir("   Texto limpio: '{limpio}' → {v}", limpio=limpio, v=v)
+    emitir("   Matriz del mensaje P (n×c): {n}×{c}", n=n, c=len(P[0]))
     # Mini sustitución sobre la primera columna
-    if len(P[0]) > 0:
-        col0 = [P[i][0] for i in range(n)]
-        print("   (Mini sustitución) c₀ = K * p₀ mod", MOD)
-        print(f"                     p₀ = {tuple(col0)}")
+    if len(P[0]) > 0 and traza_activa():
+        emitir("   (Mini sustitución) c₀ = K * p₀ mod {mod}", mod=MOD)
+        emitir("                     p₀ = {p0}", p0=tuple(P[i][0] for i in range(n)))
     C = mat_mul(K, P)
-    if len(P[0]) > 0:
-        colC0 = [C[i][0] for i in range(n)]
-        print(f"                     c₀ = {tuple(colC0)}")
+    if len(P[0]) > 0 and traza_activa():
+        emitir("                     c₀ = {c0}", c0=tuple(C[i][0] for i in range(n)))
     cif_nums = matriz_a_vector(C)
     cif = numeros_a_letras(cif_nums)
-    print(f"   Resultado cifrado → {cif_nums} → '{cif}'")
+    emitir("   Resultado cifrado → {nums} → '{cif}'", nums=cif_nums, cif=cif)
     return cif
 
 def descifrar_hill(K: List[List[int]], cifrado: str) -> str:
     n = len(K)
-    print(f"2) DESCIFRADO — calcular K^(-1) mod {MOD} y aplicar a columnas")
+    emitir("2) DESCIFRADO — calcular K^(-1) mod {mod} y aplicar a columnas", mod=MOD)
     Kinv = inv_matriz(K)
     nums = letras_a_numeros(normalizar_texto(cifrado))
     C = vector_a_matriz(nums, n)
     # Mini sustitución sobre la primera columna
-    if len(C[0]) > 0:
-        col0 = [C[i][0] for i in range(n)]
-        print("   (Mini sustitución) p₀ = K^{-1} * c₀ mod", MOD)
-        print(f"                     c₀ = {tuple(col0)}")
+    if len(C[0]) > 0 and traza_activa():
+        emitir("   (Mini sustitución) p₀ = K^{{-1}} * c₀ mod {mod}", mod=MOD)
+        emitir("                     c₀ = {c0}", c0=tuple(C[i][0] for i in range(n)))
     P = mat_mul(Kinv, C)
-    if len(C[0]) > 0:
-        colP0 = [P[i][0] for i in range(n)]
-        print(f"                     p₀ = {tuple(colP0)}")
+    if len(C[0]) > 0 and traza_activa():
+        emitir("                     p₀ = {p0}", p0=tuple(P[i][0] for i in range(n)))
     dec_nums = matriz_a_vector(P)
     dec = numeros_a_letras(dec_nums)
-    print(f"   Resultado descifrado → {dec_nums} → '{dec}'")
+    emitir("   Resultado descifrado → {nums} → '{dec}'", nums=dec_nums, dec=dec)
+    return dec
+
+# === Motor vectorizado (NumPy): cualquier n, textos grandes ===
+def aplicar_hill_arreglo(K, nums: np.ndarray) -> np.ndarray:
+    """
+    Aplica K a todos los bloques de una vez: rellena con 0 hasta múltiplo de n,
+    ve el vector como c bloques de n (columnas de P) y hace un único producto mod 27.
+    """
+    Kn = np.asarray(K, dtype=np.int64) % MOD
+    n = Kn.shape[0]
+    if Kn.shape != (n, n):
+        raise ValueError("K debe ser cuadrada")
+    resto = len(nums) % n
+    if resto:
+        nums = np.concatenate([nums, np.full(n - resto, RELLENO, dtype=nums.dtype)])  # padding con 0 ('A')
+    bloques = nums.reshape(-1, n).astype(np.int64)  # fila j = columna j de P
+    return ((bloques @ Kn.T) % MOD).astype(np.uint8).reshape(-1)
+
+def cifrar_hill_vectorizado(K, mensaje: str) -> str:
+    """Mismo resultado que cifrar_hill (padding y salida idénticos), para cualquier n×n."""
+    cif = arreglo_a_texto(aplicar_hill_arreglo(K, texto_a_arreglo(mensaje)))
+    emitir("   Cifrado vectorizado (n={n}): {c} letras", n=len(K), c=len(cif))
+    return cif
+
+def descifrar_hill_vectorizado(K, cifrado: str) -> str:
+    """Mismo resultado que descifrar_hill, aplicando K^(-1) a todos los bloques de una vez."""
+    Kinv = inv_matriz(np.asarray(K))
+    dec = arreglo_a_texto(aplicar_hill_arreglo(Kinv, texto_a_arreglo(cifrado)))
+    emitir("   Descifrado vectorizado (n={n}): {c} letras", n=len(K), c=len(dec))
     return dec
 
+# === Modo codebook: tablas bloque → bloque ===
+# Con MOD = 27 una clave n×n es una permutación fija de los 27^n bloques posibles
+# (729 para 2×2, 19 683 para 3×3). Se precalculan K·v mod 27 para todos los v y la
+# permutación inversa; cifrar/descifrar queda en un índice por bloque y una consulta.
+MAX_N_CODEBOOK = 4  # 27^4 = 531 441 bloques
+
+class CodebookHill(NamedTuple):
+    n: int
+    pesos: np.ndarray      # 27^(n-1), ..., 27, 1: bloque → índice
+    cifrar: np.ndarray     # (27^n × n) uint8: índice de v → bloque K·v mod 27
+    descifrar: np.ndarray  # (27^n × n) uint8: índice de c → bloque K^(-1)·c mod 27
+
+@lru_cache(maxsize=32)
+def _codebook_cacheado(K: Tuple[Tuple[int, ...], ...]) -> CodebookHill:
+    n = len(K)
+    if n > MAX_N_CODEBOOK:
+        raise ValueError(f"Codebook solo para n ≤ {MAX_N_CODEBOOK} (27^n entradas)")
+    inv_matriz(K)  # valida que K sea invertible mod 27
+    pesos = MOD ** np.arange(n - 1, -1, -1, dtype=np.int64)
+    indices = np.arange(MOD ** n, dtype=np.int64)
+    todos = (indices[:, None] // pesos) % MOD                      # todos los bloques v
+    imagenes = (todos @ np.asarray(K, dtype=np.int64).T) % MOD     # K·v
+    idx_imagen = imagenes @ pesos
+    inversa = np.empty_like(indices)
+    inversa[idx_imagen] = indices                                  # permutación inversa
+    return CodebookHill(n, pesos, imagenes.astype(np.uint8), todos[inversa].astype(np.uint8))
+
+def codebook_hill(K) -> CodebookHill:
+    """Tablas de cifrado y descifrado de K (se construyen una vez por clave)."""
+    return _codebook_cacheado(tuple(tuple(int(x) % MOD for x in fila) for fila in K))
+
+def _aplicar_codebook(tabla: np.ndarray, pesos: np.ndarray, nums: np.ndarray) -> np.ndarray:
+    n = len(pesos)
+    resto = len(nums) % n
+    if resto:
+        nums = np.concatenate([nums, np.full(n - resto, RELLENO, dtype=nums.dtype)])  # padding con 0 ('A')
+    bloques = nums.reshape(-1, n)
+    # índice en base 27 con sumas en int32 (más barato que un producto matricial)
+    idx = bloques[:, 0].astype(np.int32)
+    for j in range(1, n):
+        idx *= MOD
+        idx += bloques[:, j]
+    return tabla[idx].reshape(-1)
+
+def cifrar_hill_codebook(K, mensaje: str) -> str:
+    """Mismo resultado que cifrar_hill, por consulta en la tabla precalculada de K."""
+    cb = codebook_hill(K)
+    return arreglo_a_texto(_aplicar_codebook(cb.cifrar, cb.pesos, texto_a_arreglo(mensaje)))
+
+def descifrar_hill_codebook(K, cifrado: str) -> str:
+    cb = codebook_hill(K)
+    return arreglo_a_texto(_aplicar_codebook(cb.descifrar, cb.pesos, texto_a_arreglo(cifrado)))
+
+# === Flujo: archivos e iteradores con memoria acotada ===
+def _hill_flujo(K, trozos: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """
+    Aplica K trozo a trozo. Los índices que no completan un bloque pasan al trozo
+    siguiente (en un bytearray); solo el último bloque se rellena con 0 ('A').
+    Los trozos en bytes se decodifican como UTF-8 de forma incremental (una Ñ puede quedar partida).
+    """
+    n = len(K)
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    pendiente = bytearray()
+    for trozo in trozos:
+        if not isinstance(trozo, str):
+            trozo = decodificador.decode(trozo)
+        nums = texto_a_arreglo(trozo)
+        if pendiente:
+            nums = np.concatenate([np.frombuffer(pendiente, dtype=np.uint8), nums])
+        completos = len(nums) - len(nums) % n
+        pendiente = bytearray(nums[completos:].tobytes())
+        if completos:
+            yield arreglo_a_texto(aplicar_hill_arreglo(K, nums[:completos]))
+    nums = texto_a_arreglo(decodificador.decode(b"", final=True))
+    if pendiente:
+        nums = np.concatenate([np.frombuffer(pendiente, dtype=np.uint8), nums])
+    if len(nums):
+        yield arreglo_a_texto(aplicar_hill_arreglo(K, nums))
+
+def cifrar_hill_flujo(K, trozos: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """Cifra un iterador de trozos (str o bytes UTF-8); concatenado equivale a cifrar_hill."""
+    return _hill_flujo(K, trozos)
+
+def descifrar_hill_flujo(K, trozos: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """Descifra un iterador de trozos; concatenado equivale a descifrar_hill."""
+    return _hill_flujo(inv_matriz(K), trozos)
+
+def leer_trozos(archivo: BinaryIO, tam_trozo: int = 1 << 20) -> Iterator[bytes]:
+    while True:
+        trozo = archivo.read(tam_trozo)
+        if not trozo:
+            return
+        yield trozo
+
+def _hill_archivo(K, entrada: Union[str, os.PathLike, BinaryIO], salida: Union[str, os.PathLike, TextIO],
+                  tam_trozo: int) -> int:
+    abrir_entrada = isinstance(entrada, (str, os.PathLike))
+    abrir_salida = isinstance(salida, (str, os.PathLike))
+    fin = open(entrada, "rb") if abrir_entrada else entrada
+    fout = open(salida, "w", encoding="utf-8") if abrir_salida else salida
+    try:
+        escritas = 0
+        for bloque in _hill_flujo(K, leer_trozos(fin, tam_trozo)):
+            fout.write(bloque)
+            escritas += len(bloque)
+        return escritas
+    finally:
+        if abrir_entrada:
+            fin.close()
+        if abrir_salida:
+            fout.close()
+
+def cifrar_hill_archivo(K, entrada, salida, tam_trozo: int = 1 << 20) -> int:
+    """Cifra un archivo (ruta o binario abierto) hacia otro (ruta o texto abierto). Devuelve letras escritas."""
+    return _hill_archivo(K, entrada, salida, tam_trozo)
+
+def descifrar_hill_archivo(K, entrada, salida, tam_trozo: int = 1 << 20) -> int:
+    return _hill_archivo(inv_matriz(K), entrada, salida, tam_trozo)
+
 # === Demo breve ===
 if __name__ == "__main__":
+    usar_traza(TrazaConsola())
     print("=== Hill n×n (n=2 o 3) con Ñ, padding 0 y mini sustitución ===")
     # Ejemplo 3×3 con det=1 (invertible mod 27)
     K3 = [
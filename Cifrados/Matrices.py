@@ -1,87 +1,102 @@
 # Matrices.py
-from sympy import Matrix, gcd
+from math import gcd
+
+from lib.alfabeto import ALFABETO_ES, CodecAlfabeto
+from lib.matriz_modular import det_mod, inv_matriz_mod as _inv_matriz_mod, mult_mod as _mult_mod
 
 # ——————————————————————————————
 # Alfabeto base 0 con Ñ (A=0,...,Ñ=14,...,Z=26)
 # ——————————————————————————————
-ALFABETO = ["A","B","C","D","E","F","G","H","I","J","K","L","M","N","Ñ","O","P","Q","R","S","T","U","V","W","X","Y","Z"]
-M = len(ALFABETO)  # 27
-MAP_LETRA_NUM = {ch:i for i,ch in enumerate(ALFABETO)}
+CODEC = CodecAlfabeto(ALFABETO_ES, relleno="X")  # códec compartido; aquí el relleno es 'X'
+ALFABETO = list(CODEC.simbolos)
+M = CODEC.modulo  # 27
+MAP_LETRA_NUM = CODEC.mapa
 
 # ——————————————————————————————
 # Conversiones letra↔número y texto↔números (con Ñ)
 # ——————————————————————————————
 def letra_a_num(ch: str) -> int:
-    ch = ch.upper()
-    if ch not in MAP_LETRA_NUM:
-        raise ValueError(f"Carácter no soportado en el alfabeto de 27 (incluye Ñ): {ch!r}")
-    return MAP_LETRA_NUM[ch]
+    return CODEC.indice(ch)
 
 def num_a_letra(n: int) -> str:
     return ALFABETO[int(n) % M]
 
 def texto_a_nums(texto: str) -> list[int]:
-    """Convierte texto (A..Z y Ñ) a lista de enteros base-27."""
-    return [letra_a_num(c) for c in texto.upper().replace(" ", "")]
+    """Convierte texto (A..Z y Ñ) a lista de enteros base-27 (ignora espacios; falla con otros símbolos)."""
+    return CODEC.codificar_lista(texto, estricto=True)
 
 def nums_a_text(nums: list[int]) -> str:
-    return "".join(num_a_letra(n) for n in nums)
+    return CODEC.decodificar(nums)
 
 # ——————————————————————————————
-# Utilidades de matrices/vectores mod 27
+# Utilidades de matrices/vectores mod 27 (enteros puros; SymPy no hace falta aquí)
+# Matrices = listas de filas (también se aceptan sympy.Matrix o arrays con .tolist()).
+# Vectores = listas planas de enteros (vector columna).
 # ——————————————————————————————
-def matriz_clave_valida(K: Matrix, mod: int = M) -> bool:
+def _a_filas(mat) -> list[list[int]]:
+    """Matriz (o vector plano, como columna) → lista de filas de int."""
+    if hasattr(mat, "tolist"):
+        mat = mat.tolist()
+    if mat and not isinstance(mat[0], (list, tuple)):
+        return [[int(x)] for x in mat]
+    return [[int(x) for x in fila] for fila in mat]
+
+def _es_vector_plano(v) -> bool:
+    return not hasattr(v, "tolist") and not (v and isinstance(v[0], (list, tuple)))
+
+def matriz_clave_valida(K, mod: int = M) -> bool:
     """Det coprimo con 27 (no múltiplo de 3)."""
-    d = int(K.det()) % mod
-    return gcd(d, mod) == 1
+    return gcd(det_mod(_a_filas(K), mod), mod) == 1
 
-def inv_matriz_mod(K: Matrix, mod: int = M) -> Matrix:
+def inv_matriz_mod(K, mod: int = M) -> list[list[int]]:
     """Inversa modular (falla si det no es invertible mod 27)."""
-    return K.inv_mod(mod)
+    return _inv_matriz_mod(_a_filas(K), mod)
 
-def vector_mod(v: Matrix | list[int], mod: int = M) -> Matrix:
-    v = Matrix(v) if not isinstance(v, Matrix) else v
-    return v.applyfunc(lambda x: int(x) % mod)
+def vector_mod(v, mod: int = M) -> list[int] | list[list[int]]:
+    if _es_vector_plano(v):
+        return [int(x) % mod for x in v]
+    return [[x % mod for x in fila] for fila in _a_filas(v)]
 
-def mult_mod(K: Matrix, v: Matrix | list[int], mod: int = M) -> Matrix:
-    v = Matrix(v) if not isinstance(v, Matrix) else v
-    return vector_mod(K * v, mod)
+def mult_mod(K, v, mod: int = M) -> list[int] | list[list[int]]:
+    """K·v mod 27; si v es un vector plano el resultado también lo es."""
+    producto = _mult_mod(_a_filas(K), _a_filas(v), mod)
+    if _es_vector_plano(v):
+        return [fila[0] for fila in producto]
+    return producto
 
 # ——————————————————————————————
 # Impresiones con “número previo”: letraₙ
 # ——————————————————————————————
 def matriz_a_letras_list(mat) -> list[list[str]]:
     """Solo para mostrar: mapea números→letras; NO metas strings a Matrix."""
-    if isinstance(mat, Matrix):
-        return [[num_a_letra(mat[i, j]) for j in range(mat.cols)] for i in range(mat.rows)]
-    return [[num_a_letra(v) for v in fila] for fila in mat]
+    return [[num_a_letra(v) for v in fila] for fila in _a_filas(mat)]
 
-def latex_matriz_letras_y_num(mat: Matrix, parens: bool = False) -> str:
+def latex_matriz_letras_y_num(mat, parens: bool = False) -> str:
     """
     Devuelve LaTeX con letra y número como subíndice, p.ej. \text{B}_{1}
     Úsalo solo para render (NO convierte nada dentro de SymPy).
     """
     env = "pmatrix" if parens else "bmatrix"
     filas = []
-    for i in range(mat.rows):
-        cols = [rf"\text{{{num_a_letra(int(mat[i,j]))}}}_{{{int(mat[i,j])}}}" for j in range(mat.cols)]
+    for fila in _a_filas(mat):
+        cols = [rf"\text{{{num_a_letra(v)}}}_{{{v}}}" for v in fila]
         filas.append(" & ".join(cols))
     cuerpo = r" \\ ".join(filas)
     return rf"\begin{{{env}}}{cuerpo}\end{{{env}}}"
 
-def latex_vec_operacion(K: Matrix, x: Matrix, y: Matrix | None = None, mod: int = M) -> str:
+def latex_vec_operacion(K, x, y=None, mod: int = M) -> str:
     """
     Mini-sustitución: muestra K·x (=y) con letraₙ y números:
     [B₁; ...]  →  multiplica →  [C₂; ...]
     """
-    from sympy import latex
-    y = mult_mod(K, x, mod) if y is None else Matrix(y)
-    A = latex(K)
+    from sympy import Matrix, latex  # SymPy solo se carga al renderizar
+    y = mult_mod(K, x, mod) if y is None else y
+    A = latex(Matrix(_a_filas(K)))
     X_let = latex_matriz_letras_y_num(x, parens=True)
     Y_let = latex_matriz_letras_y_num(y, parens=True)
     # Extra: también la versión numérica:
-    X_num = latex(Matrix(x))
-    Y_num = latex(Matrix(y))
+    X_num = latex(Matrix(_a_filas(x)))
+    Y_num = latex(Matrix(_a_filas(y)))
     return (
         rf"{A}\cdot {X_let} = {Y_let}"
         rf"\quad\text{{ (números: }}{A}\cdot {X_num} \equiv {Y_num}\pmod{{{mod}}}\text{{)}}"
@@ -90,12 +105,9 @@ def latex_vec_operacion(K: Matrix, x: Matrix, y: Matrix | None = None, mod: int
 # ——————————————————————————————
 # Bloques Hill (padding con 'X' = 24)
 # ——————————————————————————————
-def partir_bloques(nums: list[int], n: int, padding: int = MAP_LETRA_NUM["X"]) -> list[Matrix]:
+def partir_bloques(nums: list[int], n: int, padding: int = CODEC.indice_relleno) -> list[list[int]]:
     """Parte en bloques columna de tamaño n (rellena con 'X' si falta)."""
-    out = []
-    for i in range(0, len(nums), n):
-        bloque = nums[i:i+n]
-        if len(bloque) < n:
-            bloque += [padding] * (n - len(bloque))
-        out.append(Matrix(bloque))
-    return out
+    resto = len(nums) % n
+    if resto:
+        nums = list(nums) + [padding] * (n - resto)
+    return [list(nums[i:i+n]) for i in range(0, len(nums), n)]
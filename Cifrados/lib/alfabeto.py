@@ -0,0 +1,93 @@
+# archivo: alfabeto.py
+# Códec de alfabeto compartido (Hill, Matrices, tabla_base0).
+# Convierte textos completos con tablas precalculadas en lugar de buscar carácter a carácter:
+#  - alfabetos Latin-1 (como el de 27 letras con Ñ): encode + bytes.translate filtra y mapea en C;
+#  - otros alfabetos: tabla de búsqueda del tamaño del rango Unicode usado.
+from typing import Iterable, List, Optional, Union
+
+ALFABETO_ES = "ABCDEFGHIJKLMNÑOPQRSTUVWXYZ"  # A=0, ..., N=13, Ñ=14, O=15, ..., Z=26
+
+_SIN_INDICE = 255
+
+class CodecAlfabeto:
+    """Texto ↔ índices (0..m-1) para un alfabeto y un símbolo de relleno configurables."""
+
+    def __init__(self, simbolos: str = ALFABETO_ES, relleno: Optional[str] = None, mayusculas: bool = True):
+        if len(set(simbolos)) != len(simbolos) or not 0 < len(simbolos) < _SIN_INDICE:
+            raise ValueError("El alfabeto debe tener entre 1 y 254 símbolos distintos")
+        if mayusculas and simbolos != simbolos.upper():
+            # el texto se pasa a mayúsculas: los símbolos en minúscula nunca coincidirían
+            raise ValueError("Con mayusculas=True los símbolos deben estar en mayúsculas "
+                             "(o usa mayusculas=False)")
+        self.simbolos = simbolos
+        self.modulo = len(simbolos)
+        self.mayusculas = mayusculas
+        self.mapa = {ch: i for i, ch in enumerate(simbolos)}
+        self.relleno = relleno if relleno is not None else simbolos[0]
+        if self.relleno not in self.mapa:
+            raise ValueError(f"Relleno {self.relleno!r} fuera del alfabeto")
+        self.indice_relleno = self.mapa[self.relleno]
+        self._validos = bytes(range(self.modulo))  # para comprobar índices con translate
+
+        self._latin1 = all(ord(ch) < 256 for ch in simbolos)
+        if self._latin1:
+            # byte del símbolo → índice; los demás bytes se borran en la misma llamada a translate
+            tabla = bytearray(range(256))
+            for i, ch in enumerate(simbolos):
+                tabla[ord(ch)] = i
+            self._tabla_codificar = bytes(tabla)
+            presentes = {ord(ch) for ch in simbolos}
+            self._borrar = bytes(b for b in range(256) if b not in presentes)
+            self._tabla_decodificar = bytes(ord(ch) for ch in simbolos).ljust(256, b"\0")
+        else:
+            # tabla de búsqueda sobre el rango Unicode [0, max(símbolo)]
+            self._tabla_unicode = bytearray([_SIN_INDICE]) * (max(map(ord, simbolos)) + 1)
+            for i, ch in enumerate(simbolos):
+                self._tabla_unicode[ord(ch)] = i
+
+    def _preparar(self, texto: str) -> str:
+        return texto.upper() if self.mayusculas else texto
+
+    def codificar(self, texto: str, estricto: bool = False) -> bytes:
+        """
+        Índices del texto como bytes (uno por símbolo). Por defecto descarta lo que no
+        pertenece al alfabeto; con estricto=True solo ignora espacios y falla con lo demás.
+        """
+        texto = self._preparar(texto)
+        if self._latin1:
+            indices = texto.encode("latin-1", "ignore").translate(self._tabla_codificar, self._borrar)
+        else:
+            tabla, limite = self._tabla_unicode, len(self._tabla_unicode)
+            indices = bytes(i for i in (tabla[c] if c < limite else _SIN_INDICE for c in map(ord, texto))
+                            if i != _SIN_INDICE)
+        if estricto and len(indices) != len(texto) - texto.count(" "):
+            malo = next(ch for ch in texto if ch != " " and ch not in self.mapa)
+            raise ValueError(f"Carácter no soportado en el alfabeto de {self.modulo}: {malo!r}")
+        return indices
+
+    def codificar_lista(self, texto: str, estricto: bool = False) -> List[int]:
+        return list(self.codificar(texto, estricto))
+
+    def filtrar(self, texto: str) -> str:
+        """Deja solo los símbolos del alfabeto (normalización previa al cifrado)."""
+        return self.decodificar(self.codificar(texto))
+
+    def decodificar(self, indices: Union[bytes, bytearray, memoryview, Iterable[int]]) -> str:
+        """Índices → texto en bloque; enteros fuera de rango se reducen mod m."""
+        if not isinstance(indices, (bytes, bytearray, memoryview)) or bytes(indices).translate(None, self._validos):
+            indices = bytes(int(i) % self.modulo for i in indices)
+        if self._latin1:
+            return bytes(indices).translate(self._tabla_decodificar).decode("latin-1")
+        return "".join(map(self.simbolos.__getitem__, indices))
+
+    def indice(self, ch: str) -> int:
+        """Índice de un único símbolo (ValueError si no pertenece al alfabeto)."""
+        ch = self._preparar(ch)
+        if ch not in self.mapa:
+            raise ValueError(f"Carácter no soportado en el alfabeto de {self.modulo}: {ch!r}")
+        return self.mapa[ch]
+
+    def rellenar(self, indices: bytes, n: int) -> bytes:
+        """Completa hasta múltiplo de n con el índice de relleno."""
+        resto = len(indices) % n
+        return indices + bytes([self.indice_relleno]) * (n - resto) if resto else indices
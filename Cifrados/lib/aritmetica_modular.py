@@ -0,0 +1,43 @@
+# archivo: aritmetica_modular.py
+# Aritmética modular compartida por los esquemas de cifrado y firma.
+from typing import List, Sequence, Tuple
+
+def egcd(a: int, b: int) -> Tuple[int, int, int]:
+    """Euclides extendido iterativo: (g, x, y) con a·x + b·y = g = mcd(a, b); sin límite de recursión."""
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b:
+        q, a, b = a // b, b, a % b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+def inverso_modular(valor: int, modulo: int) -> int:
+    """x tal que valor·x ≡ 1 (mod modulo); ValueError si no son coprimos."""
+    try:
+        return pow(valor, -1, modulo)  # en C; equivale a egcd(valor, modulo)[1] % modulo
+    except ValueError:
+        raise ValueError(f"No hay inverso: {valor} y {modulo} no son coprimos") from None
+
+def inversos_en_lote(valores: Sequence[int], modulo: int) -> List[int]:
+    """
+    Inversos de todos los valores mod m con el truco de Montgomery: una sola inversión
+    y 3(N-1) multiplicaciones. ValueError si alguno no es invertible.
+    """
+    n = len(valores)
+    if n == 0:
+        return []
+    prefijos = [0] * n
+    acumulado = 1
+    for i, v in enumerate(valores):
+        acumulado = acumulado * v % modulo
+        prefijos[i] = acumulado
+    try:
+        inverso = inverso_modular(acumulado, modulo)
+    except ValueError:
+        raise ValueError("Algún valor del lote no es invertible") from None
+    inversos = [0] * n
+    for i in range(n - 1, 0, -1):
+        inversos[i] = inverso * prefijos[i - 1] % modulo  # (v_0·…·v_i)^-1 · (v_0·…·v_{i-1})
+        inverso = inverso * valores[i] % modulo
+    inversos[0] = inverso
+    return inversos
@@ -0,0 +1,164 @@
+# archivo: exponenciacion.py
+# Exponenciación modular con base fija (g, y de una clave): tabla precalculada por
+# (base, módulo) y reutilizada en cada cifrado/firma.
+# Construir una tabla cuesta ≈ 10 pow() y unos MiB a 2048 bits, así que solo se construye
+# cuando la base se repite; la caché de tablas está acotada en número y en memoria.
+import sys
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+# Por debajo de este tamaño de módulo pow() ya es más barato que mantener tablas
+BITS_MINIMOS_BASE_FIJA = 256
+USOS_PARA_TABLA = 16           # potencias con pow() de una base antes de construirle tabla
+MAX_TABLAS = 128
+MEMORIA_MAX_TABLAS = 64 << 20  # bytes (estimados) entre todas las tablas cacheadas
+MAX_CONTADORES = 4096          # bases sin tabla cuyos usos se recuerdan
+
+class BaseFija:
+    """
+    base^k mod m con ventana fija de w bits: tabla[i][d] = base^(d·2^(w·i)).
+    Cada potencia cuesta ⌈bits/w⌉ multiplicaciones y ningún cuadrado.
+    """
+
+    def __init__(self, base: int, modulo: int, bits_exponente: int, ventana: int = 5):
+        self.base, self.modulo, self.bits, self.ventana = base % modulo, modulo, bits_exponente, ventana
+        self._mascara = (1 << ventana) - 1
+        self.tabla: List[List[int]] = []
+        b = self.base
+        for _ in range((bits_exponente + ventana - 1) // ventana):
+            fila = [1] * (1 << ventana)
+            x = 1
+            for d in range(1, 1 << ventana):
+                x = x * b % modulo
+                fila[d] = x
+            self.tabla.append(fila)
+            b = x * b % modulo  # base^(2^(w·(i+1)))
+        # tamaño aproximado: enteros del tamaño del módulo más los punteros de cada fila
+        self.memoria = len(self.tabla) * (1 << ventana) * (sys.getsizeof(modulo) + 8)
+
+    def potencia(self, exponente: int) -> int:
+        if exponente < 0 or exponente.bit_length() > self.bits:
+            return pow(self.base, exponente, self.modulo)
+        resultado, modulo, mascara, w = 1, self.modulo, self._mascara, self.ventana
+        for fila in self.tabla:
+            if not exponente:
+                break
+            d = exponente & mascara
+            if d:
+                resultado = resultado * fila[d] % modulo
+            exponente >>= w
+        return resultado
+
+    __call__ = potencia
+
+class _CacheTablas:
+    """LRU de tablas acotado en número y en memoria, más un LRU de usos de bases sin tabla."""
+
+    def __init__(self, max_tablas: int, max_memoria: int, max_contadores: int):
+        self.max_tablas, self.max_memoria, self.max_contadores = max_tablas, max_memoria, max_contadores
+        self._tablas: "OrderedDict[tuple, BaseFija]" = OrderedDict()
+        self._usos: "OrderedDict[tuple, int]" = OrderedDict()
+        self.memoria = 0
+        self._cerrojo = threading.Lock()
+
+    def obtener(self, clave: tuple) -> Optional[BaseFija]:
+        with self._cerrojo:
+            tabla = self._tablas.get(clave)
+            if tabla is not None:
+                self._tablas.move_to_end(clave)
+            return tabla
+
+    def contar_uso(self, clave: tuple) -> int:
+        with self._cerrojo:
+            usos = self._usos.pop(clave, 0) + 1
+            self._usos[clave] = usos
+            if len(self._usos) > self.max_contadores:
+                self._usos.popitem(last=False)
+            return usos
+
+    def guardar(self, clave: tuple, tabla: BaseFija) -> BaseFija:
+        if tabla.memoria > self.max_memoria:
+            return tabla  # no cabe: se usa esta vez y no se guarda
+        with self._cerrojo:
+            if clave in self._tablas:
+                return self._tablas[clave]
+            self._usos.pop(clave, None)
+            self._tablas[clave] = tabla
+            self.memoria += tabla.memoria
+            while len(self._tablas) > self.max_tablas or self.memoria > self.max_memoria:
+                _, vieja = self._tablas.popitem(last=False)
+                self.memoria -= vieja.memoria
+            return tabla
+
+    def vaciar(self) -> None:
+        with self._cerrojo:
+            self._tablas.clear()
+            self._usos.clear()
+            self.memoria = 0
+
+_tablas = _CacheTablas(MAX_TABLAS, MEMORIA_MAX_TABLAS, MAX_CONTADORES)
+
+def base_fija(base: int, modulo: int, bits_exponente: int, ventana: int = 5) -> BaseFija:
+    """Tabla de base fija cacheada por (base, módulo); se construye ya, sin esperar a que se repita."""
+    clave = (base % modulo, modulo, bits_exponente, ventana)
+    tabla = _tablas.obtener(clave)
+    return tabla if tabla is not None else _tablas.guardar(clave, BaseFija(*clave))
+
+def vaciar_tablas() -> None:
+    _tablas.vaciar()
+
+def potencia_base_fija(base: int, exponente: int, modulo: int, bits_exponente: Optional[int] = None) -> int:
+    """
+    pow(base, exponente, modulo) usando la tabla cacheada de (base, modulo) cuando compensa:
+    una base nueva (p.ej. la y de un destinatario puntual) usa pow() hasta su uso
+    USOS_PARA_TABLA; desde ahí se construye su tabla. Las bases de larga vida (g) la amortizan.
+    bits_exponente: cota del exponente (p.ej. q.bit_length() en DSA); por defecto la del módulo.
+    """
+    if modulo.bit_length() < BITS_MINIMOS_BASE_FIJA:
+        return pow(base, exponente, modulo)
+    clave = (base % modulo, modulo, bits_exponente or modulo.bit_length(), 5)
+    tabla = _tablas.obtener(clave)
+    if tabla is None:
+        if _tablas.contar_uso(clave) < USOS_PARA_TABLA:
+            return pow(base, exponente, modulo)
+        tabla = _tablas.guardar(clave, BaseFija(*clave))
+    return tabla.potencia(exponente)
+
+# --- multi-exponenciación simultánea (Straus / truco de Shamir) ---
+def _ventana_multi(bits: int) -> int:
+    return 2 if bits <= 64 else 3 if bits <= 160 else 4 if bits <= 1024 else 5
+
+def multi_exponenciacion(bases: Sequence[int], exponentes: Sequence[int], modulo: int,
+                         ventana: Optional[int] = None) -> int:
+    """
+    ∏ bases[i]^exponentes[i] mod m en una sola pasada de cuadrados (Straus con ventana fija):
+    por cada ventana de w bits, w cuadrados compartidos y una multiplicación por base.
+    Exponentes negativos o módulos pequeños: producto de pow().
+    """
+    if len(bases) != len(exponentes):
+        raise ValueError("Hace falta un exponente por base")
+    bits = max((e.bit_length() for e in exponentes), default=0)
+    if modulo.bit_length() < BITS_MINIMOS_BASE_FIJA or any(e < 0 for e in exponentes) or len(bases) == 1:
+        resultado = 1 % modulo
+        for b, e in zip(bases, exponentes):
+            resultado = resultado * pow(b, e, modulo) % modulo
+        return resultado
+    w = ventana or _ventana_multi(bits)
+    mascara = (1 << w) - 1
+    tablas = []
+    for b in bases:
+        b %= modulo
+        fila = [1] * (1 << w)
+        for d in range(1, 1 << w):
+            fila[d] = fila[d - 1] * b % modulo
+        tablas.append(fila)
+    resultado = 1
+    for desplazamiento in range(((bits + w - 1) // w - 1) * w, -1, -w):
+        for _ in range(w):
+            resultado = resultado * resultado % modulo
+        for fila, e in zip(tablas, exponentes):
+            d = (e >> desplazamiento) & mascara
+            if d:
+                resultado = resultado * fila[d] % modulo
+    return resultado % modulo
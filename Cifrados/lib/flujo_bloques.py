@@ -0,0 +1,142 @@
+# archivo: flujo_bloques.py
+# Cifrado por bloques de flujos de bytes (RSA, ElGamal): empaqueta los bytes en enteros del
+# mayor tamaño que cabe bajo el módulo y escribe un flujo binario con tramas de longitud.
+#
+# Formato:
+#   cabecera:  "CBLQ" | esquema (4 bytes) | ancho_claro u16 | ancho_cifra u16 | enteros_por_bloque u8
+#   tramas:    longitud_claro u32 | ⌈longitud/ancho_claro⌉ bloques × enteros_por_bloque × ancho_cifra bytes
+#   fin:       trama de longitud 0
+# Cada trama se cifra y descifra por separado: memoria acotada y reparto entre procesos.
+import os
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import BinaryIO, Callable, Iterable, Iterator, List, NamedTuple, Union
+
+_MAGIA = b"CBLQ"
+_CABECERA = struct.Struct(">4s4sHHB")
+_TRAMA = struct.Struct(">I")
+
+Ruta = Union[str, os.PathLike]
+TransformarBloques = Callable[[List[int]], List[int]]
+
+class FormatoBloques(NamedTuple):
+    esquema: bytes          # p.ej. b"RSA1", b"EGM1"
+    ancho_claro: int        # bytes de texto claro por bloque
+    ancho_cifra: int        # bytes por entero cifrado
+    enteros_por_bloque: int  # 1 en RSA, 2 (c1, c2) en ElGamal
+
+def anchos_para_modulo(modulo: int):
+    """(ancho_claro, ancho_cifra): el mayor bloque con valor < módulo y el ancho del módulo."""
+    ancho_claro = (modulo.bit_length() - 1) // 8
+    if ancho_claro < 1:
+        raise ValueError("Módulo demasiado pequeño para empaquetar bytes (se necesitan ≥ 9 bits)")
+    return ancho_claro, (modulo.bit_length() + 7) // 8
+
+def empaquetar(datos: bytes, ancho: int) -> List[int]:
+    """Bytes → enteros big-endian de `ancho` bytes (el último puede ser más corto)."""
+    return [int.from_bytes(datos[i:i + ancho], "big") for i in range(0, len(datos), ancho)]
+
+def desempaquetar(enteros: Iterable[int], ancho: int, longitud: int) -> bytes:
+    """Inversa de empaquetar: conserva ceros iniciales y recorta el último bloque a `longitud`."""
+    enteros = list(enteros)
+    if not enteros:
+        return b""
+    ultimo = longitud - ancho * (len(enteros) - 1)
+    return b"".join([m.to_bytes(ancho, "big") for m in enteros[:-1]] + [enteros[-1].to_bytes(ultimo, "big")])
+
+def _cifrar_trama(transformar: TransformarBloques, formato: FormatoBloques, trozo: bytes) -> bytes:
+    cifrados = transformar(empaquetar(trozo, formato.ancho_claro))
+    return _TRAMA.pack(len(trozo)) + b"".join(c.to_bytes(formato.ancho_cifra, "big") for c in cifrados)
+
+def _descifrar_trama(transformar: TransformarBloques, formato: FormatoBloques, trama: tuple) -> bytes:
+    longitud, cuerpo = trama
+    w = formato.ancho_cifra
+    enteros = [int.from_bytes(cuerpo[i:i + w], "big") for i in range(0, len(cuerpo), w)]
+    return desempaquetar(transformar(enteros), formato.ancho_claro, longitud)
+
+def _en_orden(funcion, elementos: Iterable, procesos: int) -> Iterator:
+    """map ordenado; con procesos > 1 usa un pool con a lo sumo 2·procesos tareas en vuelo."""
+    if procesos == 1:
+        yield from map(funcion, elementos)
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_vuelo = deque()
+        for elemento in elementos:
+            en_vuelo.append(pool.submit(funcion, elemento))
+            if len(en_vuelo) >= 2 * procesos:
+                yield en_vuelo.popleft().result()
+        while en_vuelo:
+            yield en_vuelo.popleft().result()
+
+@contextmanager
+def _abrir(archivo: Union[Ruta, BinaryIO], modo: str):
+    if isinstance(archivo, (str, os.PathLike)):
+        with open(archivo, modo) as f:
+            yield f
+    else:
+        yield archivo
+
+def _leer_trozos(archivo: BinaryIO, tam_trozo: int) -> Iterator[bytes]:
+    while True:
+        trozo = archivo.read(tam_trozo)
+        if not trozo:
+            return
+        yield trozo
+
+def cifrar_flujo(formato: FormatoBloques, cifrar_bloques: TransformarBloques,
+                 entrada: Union[Ruta, BinaryIO], salida: Union[Ruta, BinaryIO],
+                 tam_trozo: int = 1 << 16, procesos: int = 1) -> int:
+    """
+    Cifra `entrada` (ruta o binario abierto) en `salida` por tramas de `tam_trozo` bytes.
+    cifrar_bloques(lista de enteros) → enteros cifrados; con procesos > 1 debe poder
+    enviarse a otro proceso (función de módulo o functools.partial). Devuelve bytes escritos.
+    """
+    # tramas con un número entero de bloques completos (solo la última queda corta)
+    tam_trozo = min(tam_trozo, 1 << 30)
+    tam_trozo = max(formato.ancho_claro, tam_trozo - tam_trozo % formato.ancho_claro)
+    trabajo = partial(_cifrar_trama, cifrar_bloques, formato)
+    with _abrir(entrada, "rb") as fin, _abrir(salida, "wb") as fout:
+        escritos = fout.write(_CABECERA.pack(_MAGIA, *formato))
+        for trama in _en_orden(trabajo, _leer_trozos(fin, tam_trozo), procesos):
+            escritos += fout.write(trama)
+        return escritos + fout.write(_TRAMA.pack(0))
+
+def leer_formato(archivo: BinaryIO) -> FormatoBloques:
+    magia, *campos = _CABECERA.unpack(_leer_exacto(archivo, _CABECERA.size))
+    if magia != _MAGIA:
+        raise ValueError("No es un flujo cifrado por bloques")
+    return FormatoBloques(*campos)
+
+def _leer_exacto(archivo: BinaryIO, n: int) -> bytes:
+    datos = archivo.read(n)
+    if len(datos) != n:
+        raise ValueError("Flujo cifrado truncado")
+    return datos
+
+def _tramas(archivo: BinaryIO, formato: FormatoBloques) -> Iterator[tuple]:
+    ancho_bloque = formato.enteros_por_bloque * formato.ancho_cifra
+    while True:
+        (longitud,) = _TRAMA.unpack(_leer_exacto(archivo, _TRAMA.size))
+        if longitud == 0:
+            return
+        bloques = -(-longitud // formato.ancho_claro)
+        yield longitud, _leer_exacto(archivo, bloques * ancho_bloque)
+
+def descifrar_flujo(formato: FormatoBloques, descifrar_bloques: TransformarBloques,
+                    entrada: Union[Ruta, BinaryIO], salida: Union[Ruta, BinaryIO], procesos: int = 1) -> int:
+    """
+    Descifra trama a trama (memoria acotada) un flujo de cifrar_flujo; `formato` es el que
+    corresponde a la clave y debe coincidir con la cabecera. Devuelve bytes escritos.
+    """
+    with _abrir(entrada, "rb") as fin, _abrir(salida, "wb") as fout:
+        leido = leer_formato(fin)
+        if leido != formato:
+            raise ValueError(f"El flujo ({leido.esquema!r}, {leido.ancho_cifra} bytes) no corresponde a esta clave")
+        trabajo = partial(_descifrar_trama, descifrar_bloques, formato)
+        escritos = 0
+        for claro in _en_orden(trabajo, _tramas(fin, formato), procesos):
+            escritos += fout.write(claro)
+        return escritos
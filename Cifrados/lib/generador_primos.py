@@ -1,61 +1,234 @@
 # archivo: primos_ndigitos.py
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import compress
+from math import isqrt
+from os import cpu_count
 from random import Random
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+from .primalidad import es_primo
+
+def _tabla_primos_impares(limite: int) -> List[int]:
+    """Criba de Eratóstenes: primos impares ≤ limite."""
+    criba = bytearray([1]) * (limite + 1)
+    criba[0:2] = b"\x00\x00"
+    for i in range(2, isqrt(limite) + 1):
+        if criba[i]:
+            criba[i*i::i] = bytes(len(range(i*i, limite + 1, i)))
+    return [i for i in range(3, limite + 1, 2) if criba[i]]
+
+# Tabla precalculada para la criba de candidatos (6541 primos impares < 2^16)
+PRIMOS_CRIBA = _tabla_primos_impares(1 << 16)
+VENTANA_CRIBA = 4096  # candidatos impares por ventana
+
+def _cribar_ventana(residuos: List[int], primos: List[int], ventana: int) -> bytearray:
+    """
+    Marca con 0 los i de la ventana tales que (candidato + 2i) tiene un factor pequeño.
+    residuos[j] = candidato mod primos[j].
+    """
+    vivos = bytearray([1]) * ventana
+    for p, r in zip(primos, residuos):
+        # candidato + 2i ≡ 0 (mod p)  ⇔  i ≡ -r * 2^{-1} (mod p), con 2^{-1} = (p+1)/2
+        i = (-r * ((p + 1) >> 1)) % p
+        if i < ventana:
+            vivos[i::p] = bytes(len(range(i, ventana, p)))
+    return vivos
 
 def _es_probablemente_primo(n: int, rondas: int, rng: Random) -> bool:
-    if n < 2:
-        return False
-    pequeños = [2,3,5,7,11,13,17,19,23,29]
-    if n in pequeños:
-        return True
-    if any(n % p == 0 for p in pequeños):
-        return False
-    d = n - 1
-    s = 0
-    while d % 2 == 0:
-        d //= 2
-        s += 1
-    for _ in range(rondas):
-        a = rng.randrange(2, n - 2)
-        x = pow(a, d, n)
-        if x == 1 or x == n - 1:
-            continue
-        for __ in range(s - 1):
-            x = pow(x, 2, n)
-            if x == n - 1:
-                break
-        else:
-            return False
-    return True
-
-def primo_ndigitos(n_digitos: int, semilla: Optional[int] = None, rondas_mr: int = 16) -> int:
+    # Bases deterministas o BPSW según el tamaño; `rondas` son rondas MR aleatorias extra tras BPSW
+    return es_primo(n, rondas, rng)
+
+def primo_ndigitos(n_digitos: int, semilla: Optional[int] = None, rondas_mr: int = 0) -> int:
     if n_digitos < 1:
         raise ValueError("n_digitos debe ser ≥ 1")
-    rng = Random(semilla)
-    bajo = 10 ** (n_digitos - 1)
-    alto = 10 ** n_digitos - 1
+    return _primo_en_rango(10 ** (n_digitos - 1), 10 ** n_digitos - 1, Random(semilla), rondas_mr)
+
+def primo_nbits(n_bits: int, semilla: Optional[int] = None, rondas_mr: int = 0) -> int:
+    """Primo de exactamente n_bits bits (misma criba por ventanas que primo_ndigitos)."""
+    if n_bits < 2:
+        raise ValueError("n_bits debe ser ≥ 2")
+    return _primo_en_rango(1 << (n_bits - 1), (1 << n_bits) - 1, Random(semilla), rondas_mr)
+
+def _primo_en_rango(bajo: int, alto: int, rng: Random, rondas_mr: int) -> int:
+    # Solo se criba con primos < bajo: así un candidato divisible nunca es el propio primo
+    primos = [p for p in PRIMOS_CRIBA if p < bajo]
+    avance = 2 * VENTANA_CRIBA
     while True:
         candidato = rng.randrange(bajo | 1, alto + 1, 2)  # impar
+        residuos = [candidato % p for p in primos]
         while candidato <= alto:
-            if _es_probablemente_primo(candidato, rondas_mr, rng):
-                return candidato
-            candidato += 2
+            # Miller–Rabin solo sobre los supervivientes de la criba, en orden creciente
+            vivos = _cribar_ventana(residuos, primos, VENTANA_CRIBA)
+            for i in compress(range(VENTANA_CRIBA), vivos):
+                n = candidato + 2 * i
+                if n > alto:
+                    break
+                if _es_probablemente_primo(n, rondas_mr, rng):
+                    return n
+            # La ventana avanza: se actualizan los residuos en lugar de recalcularlos
+            candidato += avance
+            residuos = [(r + avance) % p for p, r in zip(primos, residuos)]
+
+# --- primos en progresión aritmética paso·u + 1 (p.ej. p = 2q·u + 1 en DSA) ---
+def _cribar_progresion(residuos: List[int], inversos: List[int], primos: List[int], ventana: int) -> bytearray:
+    """
+    Como _cribar_ventana, pero con candidatos n + paso·i: marca con 0 los i con un factor pequeño.
+    residuos[j] = n mod primos[j], inversos[j] = paso^{-1} mod primos[j].
+    """
+    vivos = bytearray([1]) * ventana
+    for p, r, inv in zip(primos, residuos, inversos):
+        i = (-r * inv) % p
+        if i < ventana:
+            vivos[i::p] = bytes(len(range(i, ventana, p)))
+    return vivos
+
+def _primo_progresion_en_bloque(paso: int, rondas_mr: int, u_inicio: int, u_fin: int,
+                                semilla_bloque: int) -> Optional[int]:
+    """Tarea: primer primo paso·u + 1 con u_inicio ≤ u < u_fin (criba + primalidad), o None."""
+    rng = Random(semilla_bloque)
+    n = paso * u_inicio + 1
+    # primos que dividen a paso nunca dividen a paso·u + 1; los ≥ n podrían ser el propio candidato
+    primos = [p for p in PRIMOS_CRIBA if p < n and paso % p]
+    inversos = [pow(paso, -1, p) for p in primos]
+    vivos = _cribar_progresion([n % p for p in primos], inversos, primos, u_fin - u_inicio)
+    for i in compress(range(u_fin - u_inicio), vivos):
+        if _es_probablemente_primo(n + paso * i, rondas_mr, rng):
+            return n + paso * i
+    return None
+
+def _buscar_por_bloques(tarea, fijos: tuple, u_bajo: int, u_alto: int, semilla: Optional[int],
+                        procesos: int) -> int:
+    """
+    Recorre bloques de VENTANA_CRIBA índices u desde un u aleatorio de [u_bajo, u_alto];
+    tarea(*fijos, inicio, fin, semilla_bloque) devuelve el primo del bloque o None.
+    Con procesos > 1 los bloques se reparten y gana el primero en orden, así que el
+    resultado no depende del número de procesos.
+    """
+    if u_bajo > u_alto:
+        raise ValueError("No hay candidatos en el rango")
+    rng = Random(semilla)
+    por_tanda = max(1, procesos)
+    pool = ProcessPoolExecutor(max_workers=por_tanda) if por_tanda > 1 else None
+    try:
+        while True:
+            u = rng.randint(u_bajo, u_alto)
+            while u <= u_alto:
+                inicios = [u + VENTANA_CRIBA * j for j in range(por_tanda)]
+                bloques = [(ini, min(ini + VENTANA_CRIBA, u_alto + 1), rng.getrandbits(64))
+                           for ini in inicios if ini <= u_alto]
+                if pool is None:
+                    resultados = (tarea(*fijos, *bloque) for bloque in bloques)
+                else:
+                    resultados = (f.result() for f in [pool.submit(tarea, *fijos, *bloque) for bloque in bloques])
+                for primo in resultados:
+                    if primo is not None:
+                        return primo
+                u = inicios[-1] + VENTANA_CRIBA
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def primo_en_progresion(paso: int, bajo: int, alto: int, semilla: Optional[int] = None,
+                        rondas_mr: int = 0, procesos: int = 1) -> int:
+    """
+    Primo p = paso·u + 1 con bajo ≤ p ≤ alto. Cada bloque de u se criba con la tabla de
+    primos pequeños y solo los supervivientes pasan la prueba de primalidad.
+    """
+    u_bajo = max(1, -(-(bajo - 1) // paso))
+    return _buscar_por_bloques(_primo_progresion_en_bloque, (paso, rondas_mr),
+                               u_bajo, (alto - 1) // paso, semilla, procesos)
+
+# --- primos seguros p = 2q + 1 ---
+def _cribar_seguros(residuos: List[int], primos: List[int], ventana: int) -> bytearray:
+    """
+    Criba combinada sobre q = q0 + 2i: descarta q ≡ 0 y q ≡ (l-1)/2 (mod l), es decir,
+    los candidatos donde q o p = 2q + 1 tienen un factor pequeño. residuos[j] = q0 mod primos[j].
+    """
+    vivos = bytearray([1]) * ventana
+    for p, r in zip(primos, residuos):
+        medio = (p + 1) >> 1  # 2^{-1} mod p
+        for objetivo in (0, (p - 1) >> 1):
+            i = ((objetivo - r) * medio) % p
+            if i < ventana:
+                vivos[i::p] = bytes(len(range(i, ventana, p)))
+    return vivos
+
+def _primo_seguro_en_bloque(rondas_mr: int, v_inicio: int, v_fin: int, semilla_bloque: int) -> Optional[int]:
+    """Tarea: primer primo seguro p = 2q + 1 con q = 2v + 1, v_inicio ≤ v < v_fin, o None."""
+    rng = Random(semilla_bloque)
+    q0 = 2 * v_inicio + 1
+    primos = [p for p in PRIMOS_CRIBA if p < q0]
+    vivos = _cribar_seguros([q0 % p for p in primos], primos, v_fin - v_inicio)
+    for i in compress(range(v_fin - v_inicio), vivos):
+        q = q0 + 2 * i
+        p = 2 * q + 1
+        # filtros baratos (una exponenciación cada uno) antes de la prueba completa de q
+        if pow(2, q - 1, q) != 1 or pow(2, p - 1, p) != 1 or p % 3 == 0:
+            continue
+        # Pocklington: con q primo > √p, 2^(p-1) ≡ 1 y mcd(2^2 - 1, p) = 1 prueban que p es primo
+        if _es_probablemente_primo(q, rondas_mr, rng):
+            return p
+    return None
+
+def primo_seguro_nbits(n_bits: int, semilla: Optional[int] = None, rondas_mr: int = 0, procesos: int = 1) -> int:
+    """Primo seguro p = 2q + 1 (q primo) de exactamente n_bits bits."""
+    if n_bits < 3:
+        raise ValueError("n_bits debe ser ≥ 3")
+    # q impar de n_bits-1 bits: q = 2v + 1 con 2^(n-3) ≤ v ≤ 2^(n-2) - 1
+    return _buscar_por_bloques(_primo_seguro_en_bloque, (rondas_mr,),
+                               1 << (n_bits - 3), (1 << (n_bits - 2)) - 1, semilla, procesos)
+
+# --- modo paralelo ---
+def primo_ndigitos_paralelo(n_digitos: int, semilla: Optional[int] = None, rondas_mr: int = 0,
+                            procesos: Optional[int] = None) -> int:
+    """
+    Primo impar de n_digitos buscado por bloques de candidatos 2·u + 1 (_buscar_por_bloques):
+    cada bloque tiene su sub-semilla derivada de `semilla` y gana el primer bloque en orden,
+    así que el resultado es el mismo con cualquier número de procesos (también con 1).
+    """
+    if n_digitos < 1:
+        raise ValueError("n_digitos debe ser ≥ 1")
+    return primo_en_progresion(2, 10 ** (n_digitos - 1), 10 ** n_digitos - 1, semilla, rondas_mr,
+                               procesos or cpu_count() or 1)
+
+def lote_primos_ndigitos(n_digitos: int, cantidad: int, semilla: Optional[int] = None,
+                         rondas_mr: int = 0, procesos: Optional[int] = None) -> List[int]:
+    """
+    Genera `cantidad` primos de n_digitos repartidos en un pool de procesos.
+    El i-ésimo primo usa la i-ésima sub-semilla derivada de `semilla` (lista reproducible).
+    """
+    base_rng = Random(semilla)
+    semillas = [base_rng.getrandbits(64) for _ in range(cantidad)]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(partial(primo_ndigitos, n_digitos, rondas_mr=rondas_mr), semillas))
+
+def lote_primos_distintos_ndigitos(n_digitos: int, cantidad: int, semilla: Optional[int] = None,
+                                   rondas_mr: int = 0, procesos: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Genera `cantidad` pares (p, q) para claves RSA en paralelo; reproducible como lote_primos_ndigitos."""
+    base_rng = Random(semilla)
+    semillas = [base_rng.getrandbits(64) for _ in range(cantidad)]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(partial(primos_distintos_ndigitos, n_digitos, rondas_mr=rondas_mr), semillas))
 
 def primos_distintos_ndigitos(n_digitos: int, semilla: Optional[int] = None,
-                              rondas_mr: int = 16) -> Tuple[int, int]:
+                              rondas_mr: int = 0, procesos: int = 1, cantidad: int = 2) -> Tuple[int, ...]:
     """
-    Devuelve (p, q) primos distintos con exactamente n_digitos.
-    Usa una semilla base para reproducibilidad determinista.
+    Devuelve `cantidad` primos distintos (p, q, ...) con exactamente n_digitos (2 por defecto;
+    3 o 4 para RSA multiprimo). Usa una semilla base para reproducibilidad determinista.
+    Con procesos > 1 los primos se buscan a la vez (mismo resultado que en secuencial).
     """
     base_rng = Random(semilla)
-    seed_p = base_rng.getrandbits(64)
-    seed_q = base_rng.getrandbits(64)
+    semillas = [base_rng.getrandbits(64) for _ in range(cantidad)]
 
-    p = primo_ndigitos(n_digitos, semilla=seed_p, rondas_mr=rondas_mr)
-    q = primo_ndigitos(n_digitos, semilla=seed_q, rondas_mr=rondas_mr)
+    if procesos > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, cantidad)) as pool:
+            primos = list(pool.map(partial(primo_ndigitos, n_digitos, rondas_mr=rondas_mr), semillas))
+    else:
+        primos = [primo_ndigitos(n_digitos, semilla=s, rondas_mr=rondas_mr) for s in semillas]
 
-    # reintenta hasta que q != p (cambia la semilla del segundo)
-    while q == p:
-        seed_q = base_rng.getrandbits(64)
-        q = primo_ndigitos(n_digitos, semilla=seed_q, rondas_mr=rondas_mr)
-    return p, q
+    # reintenta hasta que no haya repetidos (cambia la semilla de los siguientes)
+    for i in range(1, cantidad):
+        while primos[i] in primos[:i]:
+            primos[i] = primo_ndigitos(n_digitos, semilla=base_rng.getrandbits(64), rondas_mr=rondas_mr)
+    return tuple(primos)
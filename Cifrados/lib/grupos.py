@@ -0,0 +1,94 @@
+# archivo: grupos.py
+# Parámetros de grupo para ElGamal: primos seguros p = 2q + 1 y generadores comprobados.
+# Con p seguro, Z_p* tiene orden 2q y la prueba de generador se reduce a un símbolo de Jacobi.
+from functools import lru_cache
+from random import Random
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+from .cache_parametros import buscar_parametros, clave_cache, guardar_parametros
+from .generador_primos import PRIMOS_CRIBA, primo_seguro_nbits
+from .primalidad import es_primo, jacobi
+
+class GrupoPrimoSeguro(NamedTuple):
+    p: int      # primo seguro 2q + 1
+    q: int      # primo (p - 1) / 2
+    g: int
+    orden: int  # orden de g: 2q (genera Z_p*) o q (subgrupo de orden primo)
+
+@lru_cache(maxsize=64)
+def es_primo_seguro(p: int) -> bool:
+    return p >= 5 and p % 2 == 1 and es_primo((p - 1) // 2) and es_primo(p)
+
+@lru_cache(maxsize=64)
+def factores_primos_faciles(n: int) -> Optional[Tuple[int, ...]]:
+    """Primos distintos de n si bastan los primos de la criba y un cofactor primo; si no, None."""
+    factores = []
+    for f in (2, *PRIMOS_CRIBA):
+        if f * f > n:
+            break
+        if n % f == 0:
+            factores.append(f)
+            while n % f == 0:
+                n //= f
+    if n > 1:
+        if not es_primo(n):
+            return None
+        factores.append(n)
+    return tuple(factores)
+
+def es_generador(g: int, p: int, factores: Optional[Sequence[int]] = None) -> bool:
+    """
+    g genera Z_p* ⇔ g^((p-1)/f) ≠ 1 para cada primo f | p-1.
+    Con p = 2q + 1 seguro basta (g/p) = -1 (g ≠ ±1), sin exponenciaciones.
+    """
+    if not 1 < g < p - 1:
+        return False
+    factores = factores or factores_primos_faciles(p - 1)
+    if factores is None:
+        raise ValueError("p-1 no se factoriza con primos pequeños; usa un primo seguro")
+    if len(factores) == 2 and factores[0] == 2 and 2 * factores[1] + 1 == p:
+        return jacobi(g, p) == -1
+    return all(pow(g, (p - 1) // f, p) != 1 for f in factores)
+
+def proponer_generador_aleatorio(primo_p: int, semilla: Optional[int] = None) -> int:
+    """
+    Generador aleatorio g de Z_p*. Si p-1 se factoriza (p seguro o pequeño) el orden de g
+    queda comprobado; si no, solo se descarta que g sea residuo cuadrático.
+    """
+    rng = Random(semilla)
+    factores = factores_primos_faciles(primo_p - 1)
+    while True:
+        g = rng.randrange(2, primo_p)
+        if factores is not None:
+            if es_generador(g, primo_p, factores):
+                return g
+        elif pow(g, (primo_p - 1) // 2, primo_p) != 1:
+            return g
+
+def generador_subgrupo(primo_p: int, semilla: Optional[int] = None) -> int:
+    """Con p = 2q + 1 seguro: g = h² (h ≠ ±1) tiene orden q, sin más comprobaciones."""
+    h = Random(semilla).randrange(2, primo_p - 1)
+    return h * h % primo_p
+
+def generar_grupo_seguro(n_bits: int, semilla: Optional[int] = None, subgrupo: bool = False,
+                         rondas_mr: int = 0, procesos: int = 1,
+                         ruta_cache: Optional[str] = None) -> GrupoPrimoSeguro:
+    """
+    Primo seguro de n_bits (criba combinada de q y p) y un generador comprobado:
+    de Z_p* (orden 2q) o, con subgrupo=True, del subgrupo de orden primo q.
+    Con semilla fija el grupo se guarda en la caché (y en ruta_cache, JSON) para reutilizarlo.
+    """
+    clave = clave_cache("grupo-seguro", n_bits, semilla, rondas_mr, int(subgrupo)) if semilla is not None else None
+    guardado = buscar_parametros(clave, ruta_cache) if clave else None
+    if guardado:
+        return GrupoPrimoSeguro(*guardado)
+    rng = Random(semilla)
+    p = primo_seguro_nbits(n_bits, semilla=rng.getrandbits(64), rondas_mr=rondas_mr, procesos=procesos)
+    q = (p - 1) // 2
+    if subgrupo:
+        grupo = GrupoPrimoSeguro(p, q, generador_subgrupo(p, rng.getrandbits(64)), q)
+    else:
+        grupo = GrupoPrimoSeguro(p, q, proponer_generador_aleatorio(p, rng.getrandbits(64)), 2 * q)
+    if clave:
+        guardar_parametros(clave, grupo, ruta_cache)
+    return grupo
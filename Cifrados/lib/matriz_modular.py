@@ -0,0 +1,57 @@
+# archivo: matriz_modular.py
+# Álgebra lineal entera mod m (listas de filas de int), sin SymPy ni NumPy.
+# Vale para módulos compuestos como 27: la eliminación combina filas con Euclides,
+# así que un pivote que no es unidad no la detiene.
+from math import gcd
+from typing import List, Sequence, Tuple
+
+Filas = List[List[int]]
+
+def _escalonar(K: Sequence[Sequence[int]], mod: int, extra: Filas) -> Tuple[Filas, int]:
+    """
+    Triangula [K | extra] mod `mod` con Euclides entre filas. Devuelve las filas
+    y el signo acumulado por los intercambios (para el determinante).
+    """
+    n = len(K)
+    if any(len(fila) != n for fila in K):
+        raise ValueError("K debe ser cuadrada")
+    A = [[int(x) % mod for x in fila] + e for fila, e in zip(K, extra)]
+    signo = 1
+    for col in range(n):
+        # el mcd de la columna queda en A[col][col] y debajo quedan ceros
+        for fila in range(col + 1, n):
+            while A[fila][col]:
+                q = A[col][col] // A[fila][col]
+                A[col] = [(a - q*b) % mod for a, b in zip(A[col], A[fila])]
+                A[col], A[fila] = A[fila], A[col]
+                signo = -signo
+    return A, signo
+
+def det_mod(K: Sequence[Sequence[int]], mod: int) -> int:
+    """Determinante de K mod `mod`."""
+    A, signo = _escalonar(K, mod, [[] for _ in K])
+    det = signo
+    for i in range(len(A)):
+        det = (det * A[i][i]) % mod
+    return det
+
+def inv_matriz_mod(K: Sequence[Sequence[int]], mod: int) -> Filas:
+    """Inversa de K (n×n) mod `mod` por Gauss–Jordan (ValueError si det no es coprimo con mod)."""
+    n = len(K)
+    A, _ = _escalonar(K, mod, [[int(i == j) for j in range(n)] for i in range(n)])
+    for col in range(n):
+        pivote = A[col][col]
+        if gcd(pivote, mod) != 1:
+            raise ValueError(f"K no invertible mod {mod} (det no coprimo)")
+        pivote_inv = pow(pivote, -1, mod)
+        A[col] = [(a * pivote_inv) % mod for a in A[col]]
+        for fila in range(n):
+            factor = A[fila][col]
+            if fila != col and factor:
+                A[fila] = [(a - factor*b) % mod for a, b in zip(A[fila], A[col])]
+    return [fila[n:] for fila in A]
+
+def mult_mod(A: Sequence[Sequence[int]], B: Sequence[Sequence[int]], mod: int) -> Filas:
+    """A (n×k) · B (k×c) mod `mod`."""
+    columnas = list(zip(*B))
+    return [[sum(a*b for a, b in zip(fila, col)) % mod for col in columnas] for fila in A]
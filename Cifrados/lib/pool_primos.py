@@ -0,0 +1,224 @@
+# archivo: pool_primos.py
+# Pool persistente de primos precalculados por tamaño (n_digitos).
+# Formato en disco (un archivo por clase de tamaño):
+#   cabecera: magia "PRIMPOOL" | versión u16 | ancho u16 | n_digitos u32 | consumidos u64   (big-endian)
+#   registros: primos de `ancho` bytes big-endian, uno tras otro
+# El archivo se mapea en memoria; `consumidos` avanza bajo bloqueo, así que ningún
+# primo se entrega dos veces (ni entre procesos). Los ya entregados se sobrescriben con su
+# huella (SHA-256 truncado): el primo no queda en disco, pero un relleno posterior
+# (aunque repita semilla) no puede volver a añadirlo.
+# Demo: python lib/pool_primos.py [n_digitos]  (o python -m lib.pool_primos)
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+from contextlib import contextmanager
+from random import Random
+from typing import Iterable, List, Optional
+
+if not __package__:  # ejecutado como script: se importa como lib.pool_primos (PEP 366)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "lib"
+
+from .generador_primos import lote_primos_ndigitos
+from .primalidad import es_primo
+
+try:
+    import fcntl
+except ImportError:  # sin flock (Windows): solo exclusión entre hilos
+    fcntl = None
+
+_MAGIA = b"PRIMPOOL"
+_VERSION = 2  # v1 ponía a cero los consumidos y no permitía evitar reentregas
+_CABECERA = struct.Struct(">8sHHIQ")
+_CONSUMIDOS = struct.Struct(">Q")
+_OFFSET_CONSUMIDOS = _CABECERA.size - _CONSUMIDOS.size
+
+def ancho_registro(n_digitos: int) -> int:
+    """Bytes necesarios para cualquier entero de n_digitos."""
+    return ((10 ** n_digitos - 1).bit_length() + 7) // 8
+
+def ruta_pool(directorio: str, n_digitos: int) -> str:
+    return os.path.join(directorio, f"primos_{n_digitos}d.pool")
+
+@contextmanager
+def _bloqueo_archivo(archivo):
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+
+def crear_pool(ruta: str, n_digitos: int) -> None:
+    """Crea un pool vacío (no hace nada si ya existe)."""
+    try:
+        with open(ruta, "xb") as archivo:
+            archivo.write(_CABECERA.pack(_MAGIA, _VERSION, ancho_registro(n_digitos), n_digitos, 0))
+    except FileExistsError:
+        pass
+
+def _leer_cabecera(datos) -> tuple:
+    magia, version, ancho, n_digitos, consumidos = _CABECERA.unpack_from(datos, 0)
+    if magia != _MAGIA:
+        raise ValueError("Archivo de pool de primos no válido")
+    if version != _VERSION:
+        raise ValueError(f"Pool de primos versión {version} (se espera {_VERSION}): vuelve a crearlo")
+    return ancho, n_digitos, consumidos
+
+def _huella(registro: bytes) -> bytes:
+    """
+    Lo que queda en disco de un primo ya entregado. Con anchos pequeños puede coincidir con
+    la de otro primo; entonces ese primo nuevo se descarta (nunca se reentrega uno usado).
+    """
+    return hashlib.sha256(b"PRIMPOOL-consumido" + registro).digest()[:len(registro)]
+
+def agregar_primos(ruta: str, primos: Iterable[int]) -> int:
+    """
+    Añade primos al final del pool; descarta los repetidos respecto a los registros vigentes
+    y a las huellas de los ya entregados. Devuelve cuántos se escribieron.
+    """
+    with open(ruta, "r+b") as archivo, _bloqueo_archivo(archivo):
+        datos = archivo.read()
+        ancho, n_digitos, consumidos = _leer_cabecera(datos)
+        bajo, alto = 10 ** (n_digitos - 1), 10 ** n_digitos - 1
+        frontera = _CABECERA.size + consumidos * ancho
+        usados = {datos[o:o + ancho] for o in range(_CABECERA.size, frontera, ancho)}
+        vistos = {datos[o:o + ancho] for o in range(frontera, len(datos), ancho)}
+        nuevos = bytearray()
+        for p in primos:
+            if not bajo <= p <= alto:
+                raise ValueError(f"{p} no tiene {n_digitos} dígitos")
+            registro = p.to_bytes(ancho, "big")
+            if registro not in vistos and _huella(registro) not in usados:
+                vistos.add(registro)
+                nuevos += registro
+        archivo.seek(0, os.SEEK_END)
+        archivo.write(nuevos)
+        return len(nuevos) // ancho
+
+def llenar_pool(ruta: str, n_digitos: int, cantidad: int, semilla: Optional[int] = None,
+                procesos: Optional[int] = None, rondas_verificacion: int = 2) -> int:
+    """
+    Genera `cantidad` primos de n_digitos en paralelo, los verifica de nuevo
+    (BPSW + rondas_verificacion rondas aleatorias) y los añade al pool.
+    """
+    crear_pool(ruta, n_digitos)
+    rng = Random(semilla)
+    primos = lote_primos_ndigitos(n_digitos, cantidad, semilla=rng.getrandbits(64), procesos=procesos)
+    verificados = [p for p in primos if es_primo(p, rondas_verificacion, rng)]
+    return agregar_primos(ruta, verificados)
+
+class PoolPrimos:
+    """Lector mapeado en memoria: entrega cada primo del pool una sola vez."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._archivo = open(ruta, "r+b")
+        self._cerrojo = threading.Lock()
+        self._mm = None
+        self._mapear()
+
+    def _mapear(self) -> None:
+        if self._mm is not None:
+            if os.fstat(self._archivo.fileno()).st_size == len(self._mm):
+                return  # sin registros nuevos
+            self._mm.close()
+        self._mm = mmap.mmap(self._archivo.fileno(), 0)
+        self.ancho, self.n_digitos, _ = _leer_cabecera(self._mm)
+        self._total = (len(self._mm) - _CABECERA.size) // self.ancho
+
+    def _consumidos(self) -> int:
+        return _CONSUMIDOS.unpack_from(self._mm, _OFFSET_CONSUMIDOS)[0]
+
+    def disponibles(self) -> int:
+        with self._cerrojo, _bloqueo_archivo(self._archivo):
+            self._mapear()
+            return self._total - self._consumidos()
+
+    def tomar(self) -> int:
+        return self.tomar_varios(1)[0]
+
+    def tomar_varios(self, cantidad: int) -> List[int]:
+        """Entrega `cantidad` primos distintos y los marca como consumidos."""
+        with self._cerrojo, _bloqueo_archivo(self._archivo):
+            consumidos = self._consumidos()
+            if consumidos + cantidad > self._total:
+                self._mapear()  # quizá el rellenador añadió registros
+                if consumidos + cantidad > self._total:
+                    raise RuntimeError(f"Pool de primos de {self.n_digitos} dígitos agotado")
+            inicio = _CABECERA.size + consumidos * self.ancho
+            fin = inicio + cantidad * self.ancho
+            registros = [self._mm[o:o + self.ancho] for o in range(inicio, fin, self.ancho)]
+            # en disco queda solo la huella: ni el primo usado ni la posibilidad de reañadirlo
+            self._mm[inicio:fin] = b"".join(map(_huella, registros))
+            primos = [int.from_bytes(r, "big") for r in registros]
+            _CONSUMIDOS.pack_into(self._mm, _OFFSET_CONSUMIDOS, consumidos + cantidad)
+            return primos
+
+    def cerrar(self) -> None:
+        self._mm.close()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+class RellenadorPool(threading.Thread):
+    """
+    Hilo en segundo plano que mantiene al menos `minimo` primos disponibles.
+    La búsqueda pesada corre en un pool de procesos (llenar_pool), no en este hilo.
+    """
+
+    def __init__(self, ruta: str, n_digitos: int, minimo: int, lote: int = 64,
+                 semilla: Optional[int] = None, procesos: Optional[int] = None, intervalo: float = 1.0):
+        super().__init__(daemon=True)
+        self.ruta, self.n_digitos, self.minimo, self.lote = ruta, n_digitos, minimo, lote
+        self.procesos, self.intervalo = procesos, intervalo
+        self._rng = Random(semilla)
+        self._parar = threading.Event()
+        crear_pool(ruta, n_digitos)
+
+    def run(self) -> None:
+        with PoolPrimos(self.ruta) as pool:
+            while not self._parar.is_set():
+                if pool.disponibles() < self.minimo:
+                    llenar_pool(self.ruta, self.n_digitos, self.lote,
+                                semilla=self._rng.getrandbits(64), procesos=self.procesos)
+                else:
+                    self._parar.wait(self.intervalo)
+
+    def detener(self) -> None:
+        self._parar.set()
+        self.join()
+
+# --- demo breve ---
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    n_digitos = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = ruta_pool(directorio, n_digitos)
+        print(f"Llenando {ruta} ...")
+        print(f"   añadidos: {llenar_pool(ruta, n_digitos, 32)}")  # semilla aleatoria
+        with PoolPrimos(ruta) as pool:
+            print(f"   disponibles: {pool.disponibles()}")
+            p, q = pool.tomar_varios(2)
+            print(f"   p, q = {p}, {q}")
+            print(f"   disponibles: {pool.disponibles()}")
+
+        # Comprobación: rellenar con una semilla repetida nunca vuelve a entregar un primo usado
+        ruta = ruta_pool(directorio, n_digitos) + ".prueba"
+        llenar_pool(ruta, n_digitos, 8, semilla=1)
+        with PoolPrimos(ruta) as pool:
+            entregados = pool.tomar_varios(3)
+            print(f"   rellenado con la misma semilla: añadidos {llenar_pool(ruta, n_digitos, 8, semilla=1)}")
+            entregados += pool.tomar_varios(pool.disponibles())
+        assert len(set(entregados)) == len(entregados), "primo entregado dos veces"
+        print(f"   {len(entregados)} primos entregados, ninguno repetido ✅")
@@ -0,0 +1,129 @@
+# archivo: primalidad.py
+# Motor de primalidad: elige la prueba correcta más barata según el tamaño de n.
+#  - n < 3.3·10^24: Miller–Rabin con conjuntos de bases deterministas (resultado exacto).
+#  - n mayor: Baillie–PSW (Miller–Rabin fuerte en base 2 + Lucas fuerte de Selfridge).
+from math import isqrt
+from random import Random
+from typing import Optional
+
+PRIMOS_PEQUEÑOS = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+# (cota, bases): las bases bastan para todo n < cota (Jaeschke; Sorenson y Webster 2015)
+_BASES_DETERMINISTAS = (
+    (2_047, (2,)),
+    (1_373_653, (2, 3)),
+    (9_080_191, (31, 73)),
+    (25_326_001, (2, 3, 5)),
+    (4_759_123_141, (2, 7, 61)),
+    (1_122_004_669_633, (2, 13, 23, 1_662_803)),
+    (2_152_302_898_747, (2, 3, 5, 7, 11)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17)),
+    (3_825_123_056_546_413_051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318_665_857_834_031_151_167_461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+    (3_317_044_064_679_887_385_961_981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)),
+)
+
+def miller_rabin_fuerte(n: int, a: int) -> bool:
+    """Prueba fuerte de Miller–Rabin de n (impar > 2) en base a."""
+    a %= n
+    if a in (0, 1, n - 1):
+        return True
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+def jacobi(a: int, n: int) -> int:
+    """Símbolo de Jacobi (a/n) para n impar positivo."""
+    a %= n
+    resultado = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                resultado = -resultado
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            resultado = -resultado
+        a %= n
+    return resultado if n == 1 else 0
+
+def lucas_fuerte(n: int) -> bool:
+    """Prueba de Lucas fuerte con parámetros de Selfridge (método A): P = 1, Q = (1-D)/4."""
+    if isqrt(n) ** 2 == n:
+        return False  # sin D con (D/n) = -1; además n es compuesto
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    # n + 1 = d * 2^s
+    d, s = n + 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    # U_d, V_d y Q^d por duplicación binaria (empezando en k = 1)
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = P * U + V, D * U + P * V
+            if U & 1:
+                U += n
+            if V & 1:
+                V += n
+            U, V = (U >> 1) % n, (V >> 1) % n
+            Qk = Qk * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+def bpsw(n: int) -> bool:
+    """Baillie–PSW para n impar sin factores pequeños: sin contraejemplos conocidos."""
+    return miller_rabin_fuerte(n, 2) and lucas_fuerte(n)
+
+def es_primo(n: int, rondas_extra: int = 0, rng: Optional[Random] = None) -> bool:
+    """
+    Primalidad con la prueba correcta más barata para el tamaño de n.
+    Por encima de la cota determinista se usa BPSW y, si se pide, `rondas_extra`
+    rondas adicionales de Miller–Rabin con bases aleatorias.
+    """
+    if n < 2:
+        return False
+    for p in PRIMOS_PEQUEÑOS:
+        if n % p == 0:
+            return n == p
+    if n < PRIMOS_PEQUEÑOS[-1] ** 2:
+        return True
+    for cota, bases in _BASES_DETERMINISTAS:
+        if n < cota:
+            return all(miller_rabin_fuerte(n, a) for a in bases)
+    if not bpsw(n):
+        return False
+    if rondas_extra:
+        rng = rng or Random()
+        return all(miller_rabin_fuerte(n, rng.randrange(2, n - 1)) for _ in range(rondas_extra))
+    return True
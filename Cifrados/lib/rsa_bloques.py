@@ -0,0 +1,27 @@
+# archivo: rsa_bloques.py
+# Cifrado y descifrado RSA de listas de bloques para flujo_bloques.
+# Vive en lib (y no en el script RSA, sin extensión) para que los procesos hijos puedan
+# importar estas funciones al deserializarlas; las claves llegan como tuplas de enteros.
+from typing import List, Sequence
+
+def cifrar_bloques_rsa(modulo_n: int, exponente_publico_e: int, bloques: List[int]) -> List[int]:
+    return [pow(m, exponente_publico_e, modulo_n) for m in bloques]
+
+def descifrar_bloques_rsa(modulo_n: int, exponente_privado_d: int, bloques: List[int]) -> List[int]:
+    """Descifrado directo c^d mod n, para claves (n, d) sin datos CRT."""
+    return [pow(c, exponente_privado_d, modulo_n) for c in bloques]
+
+def descifrar_bloques_crt(primos: Sequence[int], exponentes: Sequence[int], coeficientes: Sequence[int],
+                          bloques: List[int]) -> List[int]:
+    """
+    Descifrado CRT con recombinación de Garner para primos r_1..r_u, exponentes d mod (r_i - 1)
+    y coeficientes t_i = (r_1·…·r_{i-1})^{-1} mod r_i. Dos primos: (q, p), (dQ, dP), (1, qInv).
+    """
+    mensajes = []
+    for c in bloques:
+        m, producto = pow(c % primos[0], exponentes[0], primos[0]), primos[0]
+        for r, d_i, t_i in zip(primos[1:], exponentes[1:], coeficientes[1:]):
+            m += producto * (((pow(c % r, d_i, r) - m) * t_i) % r)
+            producto *= r
+        mensajes.append(m)
+    return mensajes
@@ -1,120 +1,182 @@
 # DSA paso a paso con "mini sustitución" y nombres descriptivos
+from concurrent.futures import ProcessPoolExecutor
 from random import Random
 from math import gcd
-import hashlib
+from itertools import repeat
 
-# ---------- utilidades ----------
-def inverso_modular(a, m):
-    """x tal que a*x ≡ 1 (mod m)."""
-    try:
-        return pow(a, -1, m)
-    except TypeError:
-        def egcd(x, y):
-            return (x, 1, 0) if y == 0 else (lambda g, u, v: (g, v, u - (x // y) * v))(*egcd(y, x % y))
-        g, u, _ = egcd(a, m)
-        assert g == 1, "No hay inverso"
-        return u % m
+from lib.aleatorio import FuenteDeterminista, fuente_actual, randbelow
+from lib.aritmetica_modular import inverso_modular, inversos_en_lote
+from lib.cache_parametros import buscar_parametros, clave_cache, guardar_parametros
+from lib.exponenciacion import multi_exponenciacion, potencia_base_fija
+from lib.generador_primos import primo_en_progresion, primo_nbits
+from lib.precalculo import PoolPrecalculo, RegistroPools
+from lib.primalidad import es_primo
+from lib.resumen import resumen_a_entero, resumen_archivo, resumen_bytes, resumen_trozos, resumenes_archivos
+from lib.traza import TrazaConsola, emitir, usar_traza
 
+# ---------- utilidades ----------
 def _miller_rabin(n, k, rng):
-    if n < 2:
-            return False
-    # Divisores pequeños
-    pequeños = [2,3,5,7,11,13,17,19,23,29]
-    if n in pequeños:
-        return True
-    if any(n % p == 0 for p in pequeños):
-        return False
-    # n-1 = d*2^s
-    d, s = n - 1, 0
-    while d % 2 == 0:
-        d //= 2
-        s += 1
-    for _ in range(k):
-        a = rng.randrange(2, n - 2)
-        x = pow(a, d, n)
-        if x in (1, n - 1): 
-            continue
-        for __ in range(s - 1):
-            x = pow(x, 2, n)
-            if x == n - 1:
-                break
-        else:
-            return False
-    return True
-
-def _primo_de_ndigitos(n_digitos, rng, rondas=16):
+    # Motor compartido: bases deterministas o BPSW; k = rondas MR aleatorias extra tras BPSW
+    return es_primo(n, k, rng)
+
+def _primo_de_ndigitos(n_digitos, rng, rondas=0, procesos=1):
+    # Candidatos impares aleatorios del rng, en orden; gana el primero que es primo.
+    # Con procesos > 1 se prueban por tandas en paralelo y el rng se rebobina hasta el ganador:
+    # q y el estado del rng (y por tanto p y g) dependen solo de la semilla.
     bajo = 10**(n_digitos - 1)
     alto = 10**n_digitos - 1
-    if bajo <= 2 <= alto: 
-        if n_digitos == 1:
-            return 2
-    while True:
+    if n_digitos == 1:
+        return 2
+
+    def candidato():
         n = rng.randrange(bajo | 1, alto + 1, 2)
-        if _miller_rabin(n, rondas, rng):
-            return n
+        # rondas MR extra con su propio generador: no intercalan sorteos en el rng compartido
+        return n, (Random(rng.getrandbits(64)) if rondas else None)
+
+    if procesos <= 1:
+        while True:
+            n, rng_mr = candidato()
+            if _miller_rabin(n, rondas, rng_mr):
+                return n
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        while True:
+            estado = rng.getstate()
+            tanda = [candidato() for _ in range(4 * procesos)]
+            pruebas = pool.map(es_primo, [n for n, _ in tanda], repeat(rondas), [r for _, r in tanda])
+            for i, es_primo_n in enumerate(pruebas):
+                if es_primo_n:
+                    rng.setstate(estado)  # deja el rng como si se hubieran sacado solo i+1 candidatos
+                    for _ in range(i + 1):
+                        candidato()
+                    return tanda[i][0]
 
 # ---------- parámetros DSA (q | p-1) ----------
-def generar_parametros_dsa(n_digitos_q=3, semilla=2025, rondas=16):
+def generar_parametros_dsa(n_digitos_q=3, semilla=2025, rondas=0, procesos=1, pool=None):
     """
     Genera (p, q, g) con q primo pequeño (n_digitos_q) y p primo tal que q | p-1.
     Para examen: tamaños pequeños y rápidos de escribir.
+    Con procesos > 1 la búsqueda de q se reparte en un pool de procesos (mismo resultado
+    que con 1); con pool (PoolPrimos de n_digitos_q dígitos) q se toma ya precalculado.
     """
     rng = Random(semilla)
-    print("1) Elegir q primo pequeño.")
-    q = _primo_de_ndigitos(n_digitos_q, rng, rondas)
-    print(f"   q = {q}")
+    emitir("1) Elegir q primo pequeño.")
+    q = pool.tomar() if pool is not None else _primo_de_ndigitos(n_digitos_q, rng, rondas, procesos)
+    emitir("   q = {q}", q=q)
 
-    print("2) Buscar p primo tal que p ≡ 1 (mod q).")
+    emitir("2) Buscar p primo tal que p ≡ 1 (mod q).")
     # Intenta p = t*q + 1 hasta que sea primo.
     while True:
         t = rng.randrange(2, 10_000)  # rango modesto para examen
         p = t * q + 1
         if _miller_rabin(p, rondas, rng):
-            print(f"   p = {t}*{q} + 1 = {p}  (primo)")
+            emitir("   p = {t}*{q} + 1 = {p}  (primo)", t=t, q=q, p=p)
             break
 
-    print("3) Calcular generador g = h^{(p-1)/q} mod p con g>1.")
+    emitir("3) Calcular generador g = h^{{(p-1)/q}} mod p con g>1.")
     # Elegir h aleatorio, construir g = h^((p-1)/q) mod p
     exp = (p - 1) // q
     while True:
         h = rng.randrange(2, p - 1)
         g = pow(h, exp, p)
         if g > 1:
-            print(f"   h = {h}")
-            print(f"   g = h^{exp} mod {p} = {g}")
+            emitir("   h = {h}", h=h)
+            emitir("   g = h^{exp} mod {p} = {g}", exp=exp, p=p, g=g)
             break
 
-    print(f"   Parámetros: p={p}, q={q}, g={g}\n")
+    emitir("   Parámetros: p={p}, q={q}, g={g}\n", p=p, q=q, g=g)
+    return p, q, g
+
+def generar_parametros_dsa_bits(L=2048, N=256, semilla=None, rondas=0, procesos=1, ruta_cache=None):
+    """
+    Genera (p, q, g) de tamaño real: q primo de N bits y p = 2q·u + 1 primo de L bits.
+    La progresión se criba por ventanas con la tabla de primos pequeños y solo los
+    supervivientes pasan la prueba de primalidad (repartida en `procesos` si se pide).
+    Con semilla fija el resultado se guarda en la caché (y en ruta_cache, JSON) para reutilizarlo.
+    """
+    if not 2 <= N < L:
+        raise ValueError("Se necesita 2 ≤ N < L")
+    clave = clave_cache("dsa", L, N, semilla, rondas) if semilla is not None else None
+    guardados = buscar_parametros(clave, ruta_cache) if clave else None
+    if guardados:
+        emitir("Parámetros DSA (L={L}, N={N}) reutilizados de la caché", L=L, N=N)
+        return guardados
+
+    rng = Random(semilla)
+    emitir("1) Elegir q primo de {N} bits.", N=N)
+    q = primo_nbits(N, semilla=rng.getrandbits(64), rondas_mr=rondas)
+    emitir("   q = {q}", q=q)
+    emitir("2) Buscar p = 2q·u + 1 primo de {L} bits (criba de la progresión).", L=L)
+    p = primo_en_progresion(2 * q, 1 << (L - 1), (1 << L) - 1, semilla=rng.getrandbits(64),
+                            rondas_mr=rondas, procesos=procesos)
+    emitir("   p = {p}", p=p)
+    exp = (p - 1) // q
+    h = 2
+    while pow(h, exp, p) == 1:
+        h += 1
+    g = pow(h, exp, p)
+    emitir("3) g = h^{{(p-1)/q}} mod p con h = {h}: g = {g}\n", h=h, g=g)
+    if clave:
+        guardar_parametros(clave, (p, q, g), ruta_cache)
     return p, q, g
 
 # ---------- claves ----------
-def generar_claves_dsa(p, q, g, semilla=2025):
-    rng = Random(semilla ^ 0xA5A5)
-    print("4) Elegir clave privada x ∈ [1, q-1] y pública y = g^x mod p.")
+def _fuente_para(semilla):
+    # sin semilla: fuente segura activa; con semilla: reproducible (solo ejemplos y pruebas)
+    return fuente_actual() if semilla is None else FuenteDeterminista(semilla)
+
+def generar_claves_dsa(p, q, g, semilla=None):
+    rng = _fuente_para(None if semilla is None else semilla ^ 0xA5A5)
+    emitir("4) Elegir clave privada x ∈ [1, q-1] y pública y = g^x mod p.")
     x_priv = rng.randrange(1, q)  # 1..q-1
-    y_pub = pow(g, x_priv, p)
-    print(f"   x = {x_priv} (SECRETO)")
-    print(f"   y = g^x mod p = {g}^{x_priv} mod {p} = {y_pub}\n")
+    y_pub = potencia_base_fija(g, x_priv, p, q.bit_length())
+    emitir("   x = {x} (SECRETO)", x=x_priv)
+    emitir("   y = g^x mod p = {g}^{x} mod {p} = {y}\n", g=g, x=x_priv, p=p, y=y_pub)
     return (p, q, g, y_pub), x_priv
 
 # ---------- hash ----------
-def hash_entero(m_bytes: bytes) -> int:
-    """Hash SHA-1 → entero (DSA clásico)."""
-    return int.from_bytes(hashlib.sha1(m_bytes).digest(), 'big')
+ALGORITMO_HASH = "sha1"  # DSA clásico; cualquier nombre de hashlib ("sha256", "sha512", ...)
+
+def hash_entero(m_bytes: bytes, algoritmo=ALGORITMO_HASH) -> int:
+    """Hash del mensaje → entero (SHA-1 por defecto, como el DSA clásico)."""
+    return resumen_a_entero(resumen_bytes(m_bytes, algoritmo))
+
+def hash_archivo_entero(archivo, algoritmo=ALGORITMO_HASH, usar_mmap=True) -> int:
+    """Como hash_entero, pero resumiendo el archivo (ruta o binario abierto) por trozos."""
+    return resumen_a_entero(resumen_archivo(archivo, algoritmo, usar_mmap))
+
+def hash_flujo_entero(trozos, algoritmo=ALGORITMO_HASH) -> int:
+    """Como hash_entero para la concatenación de un iterable de trozos de bytes."""
+    return resumen_a_entero(resumen_trozos(trozos, algoritmo))
 
 # ---------- firma ----------
-def firmar_dsa(params_pub, x_priv, mensaje_bytes: bytes, semilla=777):
+def firmar_dsa(params_pub, x_priv, mensaje_bytes: bytes, semilla=None, algoritmo=ALGORITMO_HASH):
+    return firmar_hash_dsa(params_pub, x_priv, hash_entero(mensaje_bytes, algoritmo), semilla)
+
+def firmar_dsa_archivo(params_pub, x_priv, archivo, semilla=None, algoritmo=ALGORITMO_HASH, usar_mmap=True):
+    """Firma un archivo sin cargarlo en memoria; la firma es la misma que la de sus bytes."""
+    return firmar_hash_dsa(params_pub, x_priv, hash_archivo_entero(archivo, algoritmo, usar_mmap), semilla)
+
+def firmar_dsa_flujo(params_pub, x_priv, trozos, semilla=None, algoritmo=ALGORITMO_HASH):
+    return firmar_hash_dsa(params_pub, x_priv, hash_flujo_entero(trozos, algoritmo), semilla)
+
+def firmar_dsa_archivos(params_pub, x_priv, rutas, algoritmo=ALGORITMO_HASH, hilos=None):
+    """Firma varios archivos: los resúmenes se calculan en paralelo con hilos."""
+    return [firmar_hash_dsa(params_pub, x_priv, resumen_a_entero(d))
+            for d in resumenes_archivos(rutas, algoritmo, hilos)]
+
+def firmar_hash_dsa(params_pub, x_priv, hash_mensaje, semilla=None):
+    """Firma DSA del hash ya calculado (entero); se reduce mod q."""
     p, q, g, y = params_pub
-    rng = Random(semilla)
-    h = hash_entero(mensaje_bytes) % q
-    print("5) FIRMA DSA de H(m) (m se firma vía hash).")
-    print(f"   H(m) mod q = {h}")
+    rng = _fuente_para(semilla)  # una semilla fija repite k en cada firma: solo para ejemplos
+    h = hash_mensaje % q
+    emitir("5) FIRMA DSA de H(m) (m se firma vía hash).")
+    emitir("   H(m) mod q = {h}", h=h)
 
     while True:
         k_efimero = rng.randrange(1, q)  # 1..q-1
         if gcd(k_efimero, q) != 1:
             continue
-        r = pow(g, k_efimero, p) % q
+        r = potencia_base_fija(g, k_efimero, p, q.bit_length()) % q  # tabla de g cacheada por (g, p)
         if r == 0:
             continue
         k_inv = inverso_modular(k_efimero, q)
@@ -123,39 +185,147 @@ def firmar_dsa(params_pub, x_priv, mensaje_bytes: bytes, semilla=777):
             continue
 
         # Mini sustitución
-        print(f"   k = {k_efimero}  →  r = (g^k mod p) mod q = ({g}^{k_efimero} mod {p}) mod {q} = {r}")
-        print(f"   k^(-1) mod q = inv({k_efimero}, {q}) = {k_inv}")
-        print("   (Mini sustitución) s = k^{-1} * (H(m) + x*r) mod q")
-        print(f"                     s = {k_inv} * ({h} + {x_priv}*{r}) mod {q} = {s}\n")
+        emitir("   k = {k}  →  r = (g^k mod p) mod q = ({g}^{k} mod {p}) mod {q} = {r}", k=k_efimero, g=g, p=p, q=q, r=r)
+        emitir("   k^(-1) mod q = inv({k}, {q}) = {k_inv}", k=k_efimero, q=q, k_inv=k_inv)
+        emitir("   (Mini sustitución) s = k^{{-1}} * (H(m) + x*r) mod q")
+        emitir("                     s = {k_inv} * ({h} + {x}*{r}) mod {q} = {s}\n", k_inv=k_inv, h=h, x=x_priv, r=r, q=q, s=s)
         return (r, s)
 
+# ---------- firma con nonces precalculados ----------
+def triple_nonce_dsa(params_pub):
+    """(k, r, k^-1 mod q) independiente del mensaje; k sale de la fuente segura (distinto en cada proceso)."""
+    p, q, g, _ = params_pub
+    while True:
+        k_efimero = randbelow(q - 1) + 1  # 1..q-1
+        r = potencia_base_fija(g, k_efimero, p, q.bit_length()) % q
+        if r:
+            return k_efimero, r, inverso_modular(k_efimero, q)
+
+MAX_POOLS_NONCES = 4  # conjuntos de parámetros con pool vivo a la vez; el menos usado se detiene
+_pools_nonces = RegistroPools(MAX_POOLS_NONCES)
+
+def pool_nonces_dsa(params_pub, capacidad=256):
+    """
+    Pool de triples (k, r, k^-1) para params_pub, rellenado en segundo plano.
+    Cada triple se entrega una sola vez; tras un fork el hijo arranca su propio pool
+    y no ve los triples del padre. Hay a lo sumo MAX_POOLS_NONCES pools vivos: al pasar
+    de ahí se detiene el menos usado y sus nonces secretos se descartan.
+    """
+    params_pub = tuple(params_pub)
+    return _pools_nonces.obtener(params_pub, lambda: PoolPrecalculo(lambda: triple_nonce_dsa(params_pub), capacidad))
+
+def cerrar_pools_nonces(params_pub=None):
+    """Detiene el pool de params_pub (o todos con None) y borra sus nonces de memoria."""
+    if params_pub is None:
+        _pools_nonces.cerrar_todos()
+    else:
+        _pools_nonces.cerrar(tuple(params_pub))
+
+def firmar_dsa_precalculado(params_pub, x_priv, mensaje_bytes: bytes, pool=None, algoritmo=ALGORITMO_HASH):
+    """Firma con un triple del pool: s = k^-1 * (H(m) + x*r) mod q (dos multiplicaciones)."""
+    q = params_pub[1]
+    pool = pool or pool_nonces_dsa(params_pub)
+    h = hash_entero(mensaje_bytes, algoritmo) % q
+    while True:
+        _, r, k_inv = pool.tomar()
+        s = (k_inv * (h + x_priv * r)) % q
+        if s:
+            emitir("   Triple precalculado: r = {r}, k^(-1) = {k_inv} → s = {s}", r=r, k_inv=k_inv, s=s)
+            return (r, s)
+
 # ---------- verificación ----------
-def verificar_dsa(params_pub, mensaje_bytes: bytes, firma):
+def verificar_dsa(params_pub, mensaje_bytes: bytes, firma, algoritmo=ALGORITMO_HASH):
+    return verificar_hash_dsa(params_pub, hash_entero(mensaje_bytes, algoritmo), firma)
+
+def verificar_dsa_archivo(params_pub, archivo, firma, algoritmo=ALGORITMO_HASH, usar_mmap=True):
+    return verificar_hash_dsa(params_pub, hash_archivo_entero(archivo, algoritmo, usar_mmap), firma)
+
+def verificar_dsa_flujo(params_pub, trozos, firma, algoritmo=ALGORITMO_HASH):
+    return verificar_hash_dsa(params_pub, hash_flujo_entero(trozos, algoritmo), firma)
+
+def verificar_dsa_archivos(params_pub, rutas, firmas, algoritmo=ALGORITMO_HASH, hilos=None):
+    """[bool] por archivo: resúmenes en paralelo con hilos y w = s^-1 invertidos juntos."""
+    hashes = [resumen_a_entero(d) for d in resumenes_archivos(rutas, algoritmo, hilos)]
+    return _verificar_trozo_dsa([(h, firma, params_pub) for h, firma in zip(hashes, firmas)], None)
+
+def verificar_hash_dsa(params_pub, hash_mensaje, firma):
+    """Verificación DSA del hash ya calculado (entero); se reduce mod q."""
     p, q, g, y = params_pub
     r, s = firma
     if not (0 < r < q and 0 < s < q):
-        print("Firma fuera de rango ❌")
+        emitir("Firma fuera de rango ❌")
         return False
 
-    h = hash_entero(mensaje_bytes) % q
-    print("6) VERIFICACIÓN DSA.")
-    print(f"   H(m) mod q = {h}")
+    h = hash_mensaje % q
+    emitir("6) VERIFICACIÓN DSA.")
+    emitir("   H(m) mod q = {h}", h=h)
     w = inverso_modular(s, q)
     u1 = (h * w) % q
     u2 = (r * w) % q
-    v = (pow(g, u1, p) * pow(y, u2, p) % p) % q
+    v = multi_exponenciacion((g, y), (u1, u2), p) % q  # g^u1·y^u2 con cuadrados compartidos
 
     # Mini sustitución
-    print(f"   w = s^{-1} mod q = inv({s}, {q}) = {w}")
-    print(f"   u1 = H(m)*w mod q = {h}*{w} mod {q} = {u1}")
-    print(f"   u2 = r*w   mod q = {r}*{w} mod {q} = {u2}")
-    print("   (Mini sustitución) v = (g^{u1} * y^{u2} mod p) mod q")
-    print(f"                     v = ({g}^{u1} * {y}^{u2} mod {p}) mod {q} = {v}")
-    print(f"   ¿v == r?  →  {v} == {r}  →  {'SÍ ✅' if v == r else 'NO ❌'}\n")
+    emitir("   w = s^-1 mod q = inv({s}, {q}) = {w}", s=s, q=q, w=w)
+    emitir("   u1 = H(m)*w mod q = {h}*{w} mod {q} = {u1}", h=h, w=w, q=q, u1=u1)
+    emitir("   u2 = r*w   mod q = {r}*{w} mod {q} = {u2}", r=r, w=w, q=q, u2=u2)
+    emitir("   (Mini sustitución) v = (g^{{u1}} * y^{{u2}} mod p) mod q")
+    emitir("                     v = ({g}^{u1} * {y}^{u2} mod {p}) mod {q} = {v}", g=g, u1=u1, y=y, u2=u2, p=p, q=q, v=v)
+    emitir("   ¿v == r?  →  {v} == {r}  →  {veredicto}\n", v=v, r=r, veredicto='SÍ ✅' if v == r else 'NO ❌')
     return v == r
 
+# ---------- verificación por lotes ----------
+def _inverso_o_none(valor, modulo):
+    try:
+        return inverso_modular(valor, modulo)
+    except ValueError:
+        return None
+
+def _verificar_trozo_dsa(lote, algoritmo=ALGORITMO_HASH):
+    """
+    [(mensaje_bytes, firma, params_pub)] → [bool]; los s^-1 de cada q se invierten juntos.
+    Con algoritmo=None el primer elemento ya es el hash entero del mensaje.
+    """
+    resultados = [False] * len(lote)
+    por_q = {}
+    for i, (_, (r, s), params_pub) in enumerate(lote):
+        q = params_pub[1]
+        if 0 < r < q and 0 < s < q:
+            por_q.setdefault(q, []).append(i)
+    for q, indices in por_q.items():
+        valores_s = [lote[i][1][1] for i in indices]
+        try:
+            inversos = inversos_en_lote(valores_s, q)
+        except ValueError:
+            # algún s sin inverso (q no primo): se invierten uno a uno y esas firmas quedan en False
+            inversos = [_inverso_o_none(s, q) for s in valores_s]
+        for i, w in zip(indices, inversos):
+            if w is None:
+                continue
+            mensaje, (r, _), (p, _, g, y) = lote[i]
+            h = (mensaje if algoritmo is None else hash_entero(mensaje, algoritmo)) % q
+            resultados[i] = multi_exponenciacion((g, y), (h * w % q, r * w % q), p) % q == r
+    return resultados
+
+def verificar_lote_dsa(lote, procesos=1, tam_trozo=1024, algoritmo=ALGORITMO_HASH):
+    """
+    Verifica una lista de (mensaje_bytes, firma, params_pub) y devuelve un bool por elemento.
+    Todos los w = s^-1 mod q se calculan con una sola inversión (truco de Montgomery).
+    DSA no admite la prueba aleatorizada de lote (v se reduce mod q), así que cada firma
+    se comprueba con su multi-exponenciación; con procesos > 1 los trozos se reparten.
+    """
+    lote = list(lote)
+    if procesos == 1 or len(lote) <= tam_trozo:
+        resultados = _verificar_trozo_dsa(lote, algoritmo)
+    else:
+        trozos = [lote[i:i + tam_trozo] for i in range(0, len(lote), tam_trozo)]
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = [ok for parcial in pool.map(_verificar_trozo_dsa, trozos, [algoritmo] * len(trozos)) for ok in parcial]
+    emitir("Lote DSA: {n} firmas, {v} válidas", n=len(lote), v=sum(resultados))
+    return resultados
+
 # ---------- demo breve ----------
 if __name__ == "__main__":
+    usar_traza(TrazaConsola())
     print("=== DSA paso a paso (con mini sustitución) ===")
     # Parámetros pequeños para examen (rápidos de escribir/entender)
     p, q, g = generar_parametros_dsa(n_digitos_q=3, semilla=2025)
@@ -1,33 +1,28 @@
 # ElGamal firma paso x paso con "mini sustitución" y nombres descriptivos
-from random import Random, randrange
+from concurrent.futures import ProcessPoolExecutor
 from math import gcd
 
+from lib.aleatorio import randbelow_lote, randrange
+from lib.aritmetica_modular import inverso_modular
+from lib.exponenciacion import multi_exponenciacion, potencia_base_fija
 from lib.generador_primos import primo_ndigitos
-
-# --- utilidades ---
-def inverso_modular(valor, modulo_n):
-    """Devuelve x tal que valor*x ≡ 1 (mod modulo_n). Requiere gcd(valor, modulo_n) = 1."""
-    try:
-        return pow(valor, -1, modulo_n)  # Python 3.8+
-    except TypeError:
-        # Euclides extendido
-        def egcd(a, b):
-            return (a, 1, 0) if b == 0 else (lambda g, x, y: (g, y, x - (a // b) * y))(*egcd(b, a % b))
-        g, x, _ = egcd(valor, modulo_n)
-        assert g == 1, "No hay inverso (no coprimos)"
-        return x % modulo_n
+from lib.grupos import es_primo_seguro, generar_grupo_seguro, proponer_generador_aleatorio
+from lib.primalidad import jacobi
+from lib.resumen import resumen_a_entero, resumen_archivo, resumen_bytes, resumen_trozos, resumenes_archivos
+from lib.traza import TrazaConsola, emitir, usar_traza
 
 # --- generación de claves (igual que para cifrado ElGamal) ---
 def generar_claves(primo_modulo_p, generador_g):
-    print("1) Parámetros del grupo: primo p y generador g.")
-    print(f"   p = {primo_modulo_p}, g = {generador_g}")
+    emitir("1) Parámetros del grupo: primo p y generador g.")
+    emitir("   p = {p}, g = {g}", p=primo_modulo_p, g=generador_g)
     exponente_privado_x = randrange(1, primo_modulo_p - 1)
-    print("2) Elegir exponente privado x ∈ [1, p-2].")
-    print(f"   x = {exponente_privado_x}  (SECRETO)")
-    componente_publica_y = pow(generador_g, exponente_privado_x, primo_modulo_p)
-    print("3) Calcular y = g^x mod p (parte pública).")
-    print(f"   y = {generador_g}^{exponente_privado_x} mod {primo_modulo_p} = {componente_publica_y}")
-    print(f"   Clave pública: (p,g,y) = ({primo_modulo_p},{generador_g},{componente_publica_y}). Clave privada: x = {exponente_privado_x}.")
+    emitir("2) Elegir exponente privado x ∈ [1, p-2].")
+    emitir("   x = {x}  (SECRETO)", x=exponente_privado_x)
+    componente_publica_y = potencia_base_fija(generador_g, exponente_privado_x, primo_modulo_p)
+    emitir("3) Calcular y = g^x mod p (parte pública).")
+    emitir("   y = {g}^{x} mod {p} = {y}", g=generador_g, x=exponente_privado_x, p=primo_modulo_p, y=componente_publica_y)
+    emitir("   Clave pública: (p,g,y) = ({p},{g},{y}). Clave privada: x = {x}.",
+           p=primo_modulo_p, g=generador_g, y=componente_publica_y, x=exponente_privado_x)
     return (primo_modulo_p, generador_g, componente_publica_y), exponente_privado_x
 
 # --- firma ---
@@ -41,34 +36,35 @@ def firmar_mensaje(clave_publica, exponente_privado_x, hash_mensaje_h):
     """
     primo_modulo_p, generador_g, componente_publica_y = clave_publica
 
-    print("4) FIRMA del hash del mensaje h (0 < h < p).")
-    print(f"   h = {hash_mensaje_h}")
+    emitir("4) FIRMA del hash del mensaje h (0 < h < p).")
+    emitir("   h = {h}", h=hash_mensaje_h)
 
     # Elegir k válido: 1 ≤ k ≤ p-2, gcd(k, p-1) = 1, r != 0
     while True:
         k_efimero = randrange(1, primo_modulo_p - 1)
         if gcd(k_efimero, primo_modulo_p - 1) != 1:
             continue
-        r = pow(generador_g, k_efimero, primo_modulo_p)
+        r = potencia_base_fija(generador_g, k_efimero, primo_modulo_p)  # tabla de g cacheada
         if r == 0:
             continue
         break
 
-    print("   Elegir k efímero tal que gcd(k, p-1)=1 y r≠0.")
-    print(f"   k = {k_efimero}")
-    print(f"   r = g^k mod p = {generador_g}^{k_efimero} mod {primo_modulo_p} = {r}")
+    emitir("   Elegir k efímero tal que gcd(k, p-1)=1 y r≠0.")
+    emitir("   k = {k}", k=k_efimero)
+    emitir("   r = g^k mod p = {g}^{k} mod {p} = {r}", g=generador_g, k=k_efimero, p=primo_modulo_p, r=r)
 
     inverso_k = inverso_modular(k_efimero, primo_modulo_p - 1)
-    print(f"   k^(-1) mod (p-1) = inv({k_efimero}, {primo_modulo_p - 1}) = {inverso_k}")
+    emitir("   k^(-1) mod (p-1) = inv({k}, {p_1}) = {k_inv}", k=k_efimero, p_1=primo_modulo_p - 1, k_inv=inverso_k)
 
     # --- MINI SUSTITUCIÓN para s ---
-    print("   (Mini sustitución) s = k^(-1) * (h - x*r) mod (p-1)")
-    print(f"                      s = {inverso_k} * ({hash_mensaje_h} - {exponente_privado_x}*{r}) mod {primo_modulo_p - 1}")
+    emitir("   (Mini sustitución) s = k^(-1) * (h - x*r) mod (p-1)")
+    emitir("                      s = {k_inv} * ({h} - {x}*{r}) mod {p_1}",
+           k_inv=inverso_k, h=hash_mensaje_h, x=exponente_privado_x, r=r, p_1=primo_modulo_p - 1)
 
     s = (inverso_k * (hash_mensaje_h - exponente_privado_x * r)) % (primo_modulo_p - 1)
-    print(f"   Resultado: s = {s}")
+    emitir("   Resultado: s = {s}", s=s)
 
-    print(f"   Firma: (r, s) = ({r}, {s})\n")
+    emitir("   Firma: (r, s) = ({r}, {s})\n", r=r, s=s)
     return (r, s)
 
 # --- verificación ---
@@ -76,46 +72,163 @@ def verificar_firma(clave_publica, hash_mensaje_h, firma):
     primo_modulo_p, generador_g, componente_publica_y = clave_publica
     r, s = firma
 
-    print("5) VERIFICACIÓN de la firma (r,s).")
-    print(f"   Recibido (h, r, s) = ({hash_mensaje_h}, {r}, {s})")
+    emitir("5) VERIFICACIÓN de la firma (r,s).")
+    emitir("   Recibido (h, r, s) = ({h}, {r}, {s})", h=hash_mensaje_h, r=r, s=s)
     assert 0 < r < primo_modulo_p, "r fuera de rango"
 
     # LHS: g^h mod p
-    izquierda = pow(generador_g, hash_mensaje_h, primo_modulo_p)
+    izquierda = potencia_base_fija(generador_g, hash_mensaje_h, primo_modulo_p)
 
     # RHS: y^r * r^s mod p
-    derecha = (pow(componente_publica_y, r, primo_modulo_p) * pow(r, s, primo_modulo_p)) % primo_modulo_p
+    derecha = multi_exponenciacion((componente_publica_y, r), (r, s), primo_modulo_p)  # y^r·r^s en una pasada
 
     # --- MINI SUSTITUCIÓN de la igualdad ---
-    print("   Comprobación: g^h ≟ y^r · r^s (mod p)")
-    print(f"                 {generador_g}^{hash_mensaje_h} mod {primo_modulo_p} ≟ {componente_publica_y}^{r} · {r}^{s} mod {primo_modulo_p}")
-    print(f"   Lado izquierdo = {izquierda}")
-    print(f"   Lado derecho   = {derecha}")
+    emitir("   Comprobación: g^h ≟ y^r · r^s (mod p)")
+    emitir("                 {g}^{h} mod {p} ≟ {y}^{r} · {r}^{s} mod {p}",
+           g=generador_g, h=hash_mensaje_h, p=primo_modulo_p, y=componente_publica_y, r=r, s=s)
+    emitir("   Lado izquierdo = {izq}", izq=izquierda)
+    emitir("   Lado derecho   = {der}", der=derecha)
 
     es_valida = izquierda == derecha
-    print("   ¿Firma válida? ->", "SÍ ✅" if es_valida else "NO ❌", "\n")
+    emitir("   ¿Firma válida? -> {veredicto} \n", veredicto="SÍ ✅" if es_valida else "NO ❌")
     return es_valida
 
-# --- propuesta g (idéntica a la versión de cifrado) ---
-def proponer_generador_aleatorio(primo_p, semilla=None):
-    """Proponer un generador aleatorio g para el grupo multiplicativo Z/pZ."""
-    rng = Random(semilla)
-    while True:
-        g = rng.randrange(2, primo_p)
-        # Comprobación rápida para p primo seguro no garantizada; para demo basta probar que no sea de orden 2
-        if pow(g, (primo_p - 1) // 2, primo_p) != 1:
-            return g
-        continue
+# --- grupo con primo seguro y generador comprobado ---
+def generar_grupo_primo_seguro(n_bits, semilla=None, subgrupo=False, procesos=1, ruta_cache=None):
+    """p = 2q+1 seguro (criba combinada) y g comprobado: generador de Z_p* o, con subgrupo=True, de orden q."""
+    grupo = generar_grupo_seguro(n_bits, semilla, subgrupo=subgrupo, procesos=procesos, ruta_cache=ruta_cache)
+    emitir("   Grupo: p = 2q+1 = {p} (seguro), g = {g} de orden {orden}", p=grupo.p, g=grupo.g, orden=grupo.orden)
+    return grupo.p, grupo.g
+
+# --- parámetros desde el pool de primos precalculados ---
+def generar_grupo_desde_pool(pool, semilla=None):
+    """Toma p de un PoolPrimos y propone g; evita la búsqueda del primo en línea."""
+    primo_p = pool.tomar()
+    return primo_p, proponer_generador_aleatorio(primo_p, semilla)
 
 # --- hash simplificado para demo ---
 def hash_simplificado_a_entero(mensaje: str, primo_modulo_p: int) -> int:
     """Hash muy simple para demo: suma de códigos + longitud, reducido mod p-1 y luego desplazado a (0, p-1)."""
-    h = sum(ord(c) for c in mensaje) + len(mensaje)
+    h = sum(map(ord, mensaje)) + len(mensaje)
     # En muchas definiciones, h se toma mod (p-1) para trabajar en el exponente
     return (h % (primo_modulo_p - 1)) or 1  # Evitar 0
 
+# --- hash criptográfico de mensajes y archivos grandes ---
+ALGORITMO_HASH = "sha256"  # cualquier nombre de hashlib ("sha512", "sha3_256", ...)
+
+def hash_a_entero(mensaje_bytes: bytes, primo_modulo_p: int, algoritmo=ALGORITMO_HASH) -> int:
+    """H(m) como entero, reducido mod p-1 para usarlo en el exponente."""
+    return resumen_a_entero(resumen_bytes(mensaje_bytes, algoritmo)) % (primo_modulo_p - 1)
+
+def hash_archivo_a_entero(archivo, primo_modulo_p: int, algoritmo=ALGORITMO_HASH, usar_mmap=True) -> int:
+    """Como hash_a_entero, resumiendo el archivo (ruta o binario abierto) sin cargarlo en memoria."""
+    return resumen_a_entero(resumen_archivo(archivo, algoritmo, usar_mmap)) % (primo_modulo_p - 1)
+
+def hash_flujo_a_entero(trozos, primo_modulo_p: int, algoritmo=ALGORITMO_HASH) -> int:
+    """Como hash_a_entero para la concatenación de un iterable de trozos de bytes."""
+    return resumen_a_entero(resumen_trozos(trozos, algoritmo)) % (primo_modulo_p - 1)
+
+def firmar_archivo(clave_publica, exponente_privado_x, archivo, algoritmo=ALGORITMO_HASH, usar_mmap=True):
+    h = hash_archivo_a_entero(archivo, clave_publica[0], algoritmo, usar_mmap)
+    return firmar_mensaje(clave_publica, exponente_privado_x, h)
+
+def verificar_archivo(clave_publica, archivo, firma, algoritmo=ALGORITMO_HASH, usar_mmap=True):
+    h = hash_archivo_a_entero(archivo, clave_publica[0], algoritmo, usar_mmap)
+    return _firma_valida(clave_publica, h, firma)
+
+def verificar_archivos(clave_publica, rutas, firmas, algoritmo=ALGORITMO_HASH, hilos=None, procesos=1):
+    """[bool] por archivo: resúmenes en paralelo con hilos y luego verificar_lote."""
+    hashes = [resumen_a_entero(d) % (clave_publica[0] - 1) for d in resumenes_archivos(rutas, algoritmo, hilos)]
+    return verificar_lote([(h, firma, clave_publica) for h, firma in zip(hashes, firmas)], procesos)
+
+# --- verificación por lotes ---
+BITS_PRUEBA_LOTE = 64   # una firma inválida pasa la prueba de lote con probabilidad ≤ 2^-64
+TAMAÑO_MINIMO_LOTE = 4  # por debajo se verifica firma a firma
+
+def _firma_valida(clave_publica, hash_mensaje_h, firma):
+    """verificar_firma sin traza ni assert (para lotes)."""
+    primo_modulo_p, generador_g, componente_publica_y = clave_publica
+    r, s = firma
+    return (0 < r < primo_modulo_p and
+            potencia_base_fija(generador_g, hash_mensaje_h, primo_modulo_p)
+            == multi_exponenciacion((componente_publica_y, r), (r, s), primo_modulo_p))
+
+def _caracter_cuadratico_coherente(clave_publica, hash_mensaje_h, firma):
+    """(g/p)^h == (y/p)^r · (r/p)^s: la ecuación de verificación reducida a ±1 (símbolos de Legendre)."""
+    primo_modulo_p, generador_g, componente_publica_y = clave_publica
+    r, s = firma
+    izquierda = jacobi(generador_g, primo_modulo_p) ** (hash_mensaje_h & 1)
+    derecha = jacobi(componente_publica_y, primo_modulo_p) ** (r & 1) * jacobi(r, primo_modulo_p) ** (s & 1)
+    return izquierda == derecha
+
+def _prueba_lote(lote, primo_modulo_p, generador_g):
+    """
+    Prueba de exponentes pequeños (Bellare–Garay–Rabin) con e_i aleatorios:
+    g^(Σ e_i·h_i) ≡ ∏_y y^(Σ e_i·r_i) · ∏ r_i^(e_i·s_i)  (mod p), en una multi-exponenciación.
+    """
+    orden = primo_modulo_p - 1
+    exponente_g, exponentes_y, bases, exponentes = 0, {}, [], []
+    coeficientes = randbelow_lote(1 << BITS_PRUEBA_LOTE, len(lote))
+    for e, (hash_mensaje_h, (r, s), (_, _, componente_publica_y)) in zip(coeficientes, lote):
+        exponente_g += e * hash_mensaje_h
+        exponentes_y[componente_publica_y] = exponentes_y.get(componente_publica_y, 0) + e * r
+        bases.append(r)
+        exponentes.append(e * s % orden)
+    bases += [generador_g, *exponentes_y]
+    exponentes += [-exponente_g % orden, *(e % orden for e in exponentes_y.values())]
+    return multi_exponenciacion(bases, exponentes, primo_modulo_p) == 1
+
+def _verificar_por_biseccion(lote, primo_modulo_p, generador_g):
+    if len(lote) <= TAMAÑO_MINIMO_LOTE:
+        return [_firma_valida(clave, h, firma) for h, firma, clave in lote]
+    if _prueba_lote(lote, primo_modulo_p, generador_g):
+        return [True] * len(lote)
+    mitad = len(lote) // 2  # alguna firma falla: se parte el lote para localizarla
+    return (_verificar_por_biseccion(lote[:mitad], primo_modulo_p, generador_g)
+            + _verificar_por_biseccion(lote[mitad:], primo_modulo_p, generador_g))
+
+def _verificar_trozo(lote):
+    """[(h, firma, clave_publica)] → [bool], agrupando por parámetros de dominio (p, g)."""
+    resultados = [False] * len(lote)
+    grupos = {}
+    for i, (hash_mensaje_h, firma, clave_publica) in enumerate(lote):
+        primo_modulo_p, generador_g, _ = clave_publica
+        if not 0 < firma[0] < primo_modulo_p:
+            continue
+        grupos.setdefault((primo_modulo_p, generador_g), []).append(i)
+    for (primo_modulo_p, generador_g), indices in grupos.items():
+        # La prueba aleatorizada solo es fiable en el subgrupo de orden primo q = (p-1)/2:
+        # con p seguro, el símbolo de Legendre comprueba aparte la componente de orden 2.
+        if primo_modulo_p.bit_length() > BITS_PRUEBA_LOTE + 2 and es_primo_seguro(primo_modulo_p):
+            coherentes = [i for i in indices if _caracter_cuadratico_coherente(lote[i][2], lote[i][0], lote[i][1])]
+            for i, ok in zip(coherentes, _verificar_por_biseccion([lote[i] for i in coherentes],
+                                                                  primo_modulo_p, generador_g)):
+                resultados[i] = ok
+        else:
+            for i in indices:
+                resultados[i] = _firma_valida(lote[i][2], lote[i][0], lote[i][1])
+    return resultados
+
+def verificar_lote(lote, procesos=1, tam_trozo=1024):
+    """
+    Verifica una lista de (hash_mensaje_h, firma, clave_publica) y devuelve un bool por elemento.
+    Con p seguro (p = 2q+1) las firmas de un mismo (p, g) se comprueban juntas con la prueba
+    aleatorizada y, si falla, por bisección; con otros p, firma a firma. Con procesos > 1
+    los trozos de `tam_trozo` firmas se reparten en un pool de procesos.
+    """
+    lote = list(lote)
+    if procesos == 1 or len(lote) <= tam_trozo:
+        resultados = _verificar_trozo(lote)
+    else:
+        trozos = [lote[i:i + tam_trozo] for i in range(0, len(lote), tam_trozo)]
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = [ok for parcial in pool.map(_verificar_trozo, trozos) for ok in parcial]
+    emitir("Lote ElGamal: {n} firmas, {v} válidas", n=len(lote), v=sum(resultados))
+    return resultados
+
 # --- demo breve ---
 if __name__ == "__main__":
+    usar_traza(TrazaConsola())
     print("=== ElGamal firma paso x paso (con mini sustitución) ===")
     # Primo pequeño y generador para demo de examen
     primo_p = primo_ndigitos(4, semilla=2026)
@@ -0,0 +1,130 @@
+# archivo: aleatorio.py
+# Fuente de aleatoriedad intercambiable para claves y nonces (como el destino de la traza):
+#  - FuenteSegura: os.urandom con búfer (una llamada al sistema cada tam_bufer bytes),
+#    apta para claves y nonces; segura entre hilos y tras un fork.
+#    randbelow_lote() saca muchos enteros de una sola lectura: es el camino rápido.
+#  - FuenteDeterminista: Mersenne Twister con semilla, solo para pruebas reproducibles
+#    (mismas secuencias que random.Random(semilla)).
+# Ambas son random.Random, así que randrange/randint/choice funcionan igual.
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from random import Random
+from typing import List
+
+class _RandBelow:
+    def randbelow(self, n: int) -> int:
+        """Entero uniforme en [0, n): se descartan los valores ≥ n (sin sesgo)."""
+        if n <= 0:
+            raise ValueError("n debe ser positivo")
+        k = n.bit_length()
+        r = self.getrandbits(k)
+        while r >= n:
+            r = self.getrandbits(k)
+        return r
+
+    def randbelow_lote(self, n: int, cantidad: int) -> List[int]:
+        """`cantidad` enteros uniformes en [0, n) a partir de un solo bloque de bytes."""
+        if n <= 0:
+            raise ValueError("n debe ser positivo")
+        k = n.bit_length()
+        ancho, sobrante = (k + 7) // 8, -k % 8
+        enteros: List[int] = []
+        while len(enteros) < cantidad:
+            datos = self.randbytes(ancho * (cantidad - len(enteros)))
+            enteros += [r for i in range(0, len(datos), ancho)
+                        if (r := int.from_bytes(datos[i:i + ancho], "big") >> sobrante) < n]
+        return enteros
+
+# fuentes seguras vivas: el hijo de un fork descarta los bytes heredados del padre
+_fuentes_seguras = weakref.WeakSet()
+
+def _tras_fork() -> None:
+    for fuente in list(_fuentes_seguras):
+        fuente._reiniciar()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_tras_fork)
+
+class FuenteSegura(_RandBelow, Random):
+    """Bytes de os.urandom servidos desde un búfer que se rellena en bloques grandes."""
+
+    def __init__(self, tam_bufer: int = 1 << 14):
+        self._tam_bufer = tam_bufer
+        self._reiniciar()
+        super().__init__()
+        _fuentes_seguras.add(self)
+
+    def _reiniciar(self) -> None:
+        self._bufer, self._pos = b"", 0
+        self._cerrojo = threading.Lock()
+
+    def seed(self, *args, **kwargs) -> None:
+        """Sin efecto: la fuente del sistema no se siembra."""
+
+    def getstate(self):
+        raise NotImplementedError("La fuente del sistema no tiene estado reproducible")
+
+    setstate = getstate
+
+    def _tomar(self, n: int) -> bytes:
+        if n >= self._tam_bufer:
+            return os.urandom(n)
+        with self._cerrojo:
+            pos = self._pos
+            if pos + n > len(self._bufer):
+                self._bufer, pos = self._bufer[pos:] + os.urandom(self._tam_bufer), 0
+            self._pos = pos + n
+            return self._bufer[pos:pos + n]
+
+    def getrandbits(self, k: int) -> int:
+        if k <= 0:
+            if k < 0:
+                raise ValueError("k debe ser ≥ 0")
+            return 0
+        n = (k + 7) // 8
+        return int.from_bytes(self._tomar(n), "big") >> (8 * n - k)
+
+    def randbytes(self, n: int) -> bytes:
+        return self._tomar(n)
+
+    def random(self) -> float:
+        return (int.from_bytes(self._tomar(7), "big") >> 3) * 2.0 ** -53
+
+class FuenteDeterminista(_RandBelow, Random):
+    """Random(semilla) con randbelow: reproducible, NO apta para claves reales."""
+
+# --- fuente activa ---
+_fuente: Random = FuenteSegura()
+
+def usar_fuente(fuente: Random) -> Random:
+    """Cambia la fuente de claves y nonces (p.ej. FuenteDeterminista(0) en pruebas). Devuelve la anterior."""
+    global _fuente
+    anterior = _fuente
+    _fuente = fuente
+    return anterior
+
+@contextmanager
+def con_fuente(fuente: Random):
+    """Usa `fuente` solo dentro del bloque with."""
+    anterior = usar_fuente(fuente)
+    try:
+        yield fuente
+    finally:
+        usar_fuente(anterior)
+
+def fuente_actual() -> Random:
+    return _fuente
+
+def randbelow(n: int) -> int:
+    return _fuente.randbelow(n)
+
+def randrange(*args) -> int:
+    return _fuente.randrange(*args)
+
+def getrandbits(k: int) -> int:
+    return _fuente.getrandbits(k)
+
+def randbelow_lote(n: int, cantidad: int) -> List[int]:
+    return _fuente.randbelow_lote(n, cantidad)
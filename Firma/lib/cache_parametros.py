@@ -0,0 +1,60 @@
+# archivo: cache_parametros.py
+# Caché de parámetros de dominio (DSA, grupos ElGamal): en memoria y, opcionalmente,
+# persistida en un archivo JSON para reutilizarla entre ejecuciones.
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+_memoria: Dict[str, Tuple[int, ...]] = {}
+
+def clave_cache(*partes) -> str:
+    """Clave legible, p.ej. clave_cache("dsa", 2048, 256, semilla) → 'dsa-2048-256-...'."""
+    return "-".join(str(p) for p in partes)
+
+@contextmanager
+def _bloqueo(ruta: str):
+    with open(ruta + ".lock", "a") as archivo:
+        if fcntl is not None:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+
+def _leer(ruta: str) -> Dict[str, list]:
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return {}
+
+def buscar_parametros(clave: str, ruta: Optional[str] = None) -> Optional[Tuple[int, ...]]:
+    """Parámetros guardados con `clave` (primero en memoria, luego en `ruta`), o None."""
+    if clave in _memoria:
+        return _memoria[clave]
+    if ruta is not None:
+        valores = _leer(ruta).get(clave)
+        if valores is not None:
+            _memoria[clave] = tuple(valores)
+            return _memoria[clave]
+    return None
+
+def guardar_parametros(clave: str, valores: Sequence[int], ruta: Optional[str] = None) -> None:
+    """Guarda en memoria y, si hay `ruta`, en el JSON (escritura atómica bajo bloqueo)."""
+    _memoria[clave] = tuple(valores)
+    if ruta is None:
+        return
+    with _bloqueo(ruta):
+        datos = _leer(ruta)
+        datos[clave] = list(valores)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo, indent=1)
+        os.replace(temporal, ruta)
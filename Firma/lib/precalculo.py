@@ -0,0 +1,147 @@
+# archivo: precalculo.py
+# Pool de valores efímeros precalculados en segundo plano (p.ej. pares (g^k, y^k) de ElGamal).
+# Un hilo llena una cola acotada; el paso en línea solo saca un valor ya listo.
+#  - Cada valor se entrega una sola vez (se saca de la cola) y nunca se reutiliza.
+#  - Si la cola está vacía, el valor se calcula en línea en lugar de esperar.
+#  - Tras un fork el hijo no usa los valores heredados del padre (descarta la cola).
+#  - RegistroPools: un pool por clave (p.ej. clave pública) con un máximo de pools vivos;
+#    el menos usado se detiene y sus valores se descartan.
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, List, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+class MetricasPool(NamedTuple):
+    disponibles: int      # nivel de llenado actual
+    capacidad: int
+    generados: int        # calculados por el hilo de fondo
+    consumidos: int       # entregados desde la cola
+    en_linea: int         # calculados en línea porque la cola estaba vacía
+    tasa_relleno: float   # valores/segundo del hilo de fondo (tiempo de cálculo)
+
+class PoolPrecalculo(threading.Thread, Generic[T]):
+    """
+    Mantiene hasta `capacidad` valores de `generar()` listos para usar.
+    El cálculo (pow de enteros grandes) comparte el GIL con el proceso, así que el
+    beneficio es sacarlo del camino crítico: se rellena mientras no hay peticiones.
+    """
+
+    def __init__(self, generar: Callable[[], T], capacidad: int = 256):
+        super().__init__(daemon=True)
+        if capacidad < 1:
+            raise ValueError("La capacidad debe ser al menos 1")
+        self.generar, self.capacidad = generar, capacidad
+        self._cola: "queue.Queue[T]" = queue.Queue(maxsize=capacidad)
+        self._parar = threading.Event()
+        self._pid = os.getpid()
+        self._generados = self._consumidos = self._en_linea = 0
+        self._segundos = 0.0
+
+    def run(self) -> None:
+        while not self._parar.is_set():
+            t0 = time.perf_counter()
+            valor = self.generar()
+            self._segundos += time.perf_counter() - t0
+            self._generados += 1
+            while not self._parar.is_set():
+                try:
+                    self._cola.put(valor, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def tomar(self) -> T:
+        """Saca un valor precalculado (o lo calcula en línea si no queda ninguno)."""
+        if os.getpid() != self._pid:
+            self._tras_fork()
+        try:
+            valor = self._cola.get_nowait()
+            self._consumidos += 1
+            return valor
+        except queue.Empty:
+            self._en_linea += 1
+            return self.generar()
+
+    def _tras_fork(self) -> None:
+        # el hijo hereda una copia de la cola: usarla repetiría valores del padre
+        self._pid = os.getpid()
+        self._cola = queue.Queue(maxsize=self.capacidad)
+        self._parar.set()  # el hilo de fondo no existe en el hijo; se calcula en línea
+
+    def disponibles(self) -> int:
+        return self._cola.qsize()
+
+    def metricas(self) -> MetricasPool:
+        tasa = self._generados / self._segundos if self._segundos else 0.0
+        return MetricasPool(self.disponibles(), self.capacidad, self._generados,
+                            self._consumidos, self._en_linea, tasa)
+
+    def detener(self) -> None:
+        """Para el hilo y descarta los valores pendientes; tomar() sigue funcionando (en línea)."""
+        self._parar.set()
+        if self.is_alive():
+            self.join()
+        self._cola = queue.Queue(maxsize=self.capacidad)
+
+class RegistroPools:
+    """
+    Pools arrancados bajo demanda, uno por clave, con a lo sumo `max_pools` vivos.
+    Ciclo de vida: obtener() crea y arranca el pool la primera vez; al superar max_pools
+    se detiene el usado menos recientemente, y cerrar()/cerrar_todos() los detienen
+    explícitamente. Un pool detenido descarta sus valores y ya no gasta CPU.
+    Tras un fork el hijo descarta todos los pools heredados y arranca los suyos.
+    """
+
+    def __init__(self, max_pools: int = 8):
+        if max_pools < 1:
+            raise ValueError("max_pools debe ser al menos 1")
+        self.max_pools = max_pools
+        self._pools: "OrderedDict[Hashable, PoolPrecalculo]" = OrderedDict()
+        self._cerrojo = threading.Lock()
+        self._pid = os.getpid()
+
+    def _tras_fork(self) -> None:
+        # los hilos del padre no existen en el hijo; sus valores no deben reutilizarse
+        for pool in self._pools.values():
+            pool.detener()
+        self._pools = OrderedDict()
+        self._cerrojo = threading.Lock()
+        self._pid = os.getpid()
+
+    def obtener(self, clave: Hashable, crear: Callable[[], PoolPrecalculo]) -> PoolPrecalculo:
+        """Pool de `clave`; crear() construye uno nuevo (sin arrancar) si no existe."""
+        if os.getpid() != self._pid:
+            self._tras_fork()
+        expulsados: List[PoolPrecalculo] = []
+        with self._cerrojo:
+            pool = self._pools.get(clave)
+            if pool is not None:
+                self._pools.move_to_end(clave)
+                return pool
+            pool = crear()
+            pool.start()
+            self._pools[clave] = pool
+            while len(self._pools) > self.max_pools:
+                expulsados.append(self._pools.popitem(last=False)[1])
+        for viejo in expulsados:  # fuera del cerrojo: detener() espera al hilo
+            viejo.detener()
+        return pool
+
+    def cerrar(self, clave: Hashable) -> None:
+        with self._cerrojo:
+            pool = self._pools.pop(clave, None)
+        if pool is not None:
+            pool.detener()
+
+    def cerrar_todos(self) -> None:
+        with self._cerrojo:
+            pools, self._pools = list(self._pools.values()), OrderedDict()
+        for pool in pools:
+            pool.detener()
+
+    def __len__(self) -> int:
+        return len(self._pools)
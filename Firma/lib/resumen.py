@@ -0,0 +1,78 @@
+# archivo: resumen.py
+# Resumen (hash) incremental de mensajes grandes para firmar y verificar sin cargarlos en RAM:
+#  - archivos: mmap (sin copias) o lecturas con búfer (hashlib.file_digest) si no se puede mapear,
+#  - iterables de trozos de bytes (flujos, sockets, generadores).
+# hashlib suelta el GIL al resumir trozos grandes: varios archivos se resumen en paralelo con hilos.
+import hashlib
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, List, Optional, Sequence, Union
+
+Ruta = Union[str, os.PathLike]
+
+TAM_TROZO = 1 << 23  # 8 MiB por update(): bastante para soltar el GIL sin recorrer todo de golpe
+
+def _nuevo(algoritmo: str):
+    try:
+        return hashlib.new(algoritmo)
+    except ValueError:
+        raise ValueError(f"Algoritmo de hash no disponible: {algoritmo!r}") from None
+
+def resumen_bytes(datos: bytes, algoritmo: str) -> bytes:
+    h = _nuevo(algoritmo)
+    h.update(datos)
+    return h.digest()
+
+def resumen_trozos(trozos: Iterable[bytes], algoritmo: str) -> bytes:
+    """Resumen de la concatenación de `trozos`, sin juntarlos en memoria."""
+    h = _nuevo(algoritmo)
+    for trozo in trozos:
+        h.update(trozo)
+    return h.digest()
+
+def _resumen_mapeado(f: BinaryIO, algoritmo: str) -> Optional[bytes]:
+    """Resumen vía mmap; None si no se puede mapear (vacío, tubería, ya empezado a leer...)."""
+    try:
+        if f.tell() != 0:
+            return None
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, AttributeError):
+        return None
+    with mapa:
+        aviso = getattr(mapa, "madvise", None)
+        if aviso and hasattr(mmap, "MADV_SEQUENTIAL"):
+            aviso(mmap.MADV_SEQUENTIAL)
+        soltar = aviso if aviso and hasattr(mmap, "MADV_DONTNEED") else None
+        h = _nuevo(algoritmo)
+        with memoryview(mapa) as vista:
+            for i in range(0, len(vista), TAM_TROZO):
+                h.update(vista[i:i + TAM_TROZO])
+                if soltar:  # las páginas ya resumidas salen del proceso: memoria acotada a un trozo
+                    soltar(mmap.MADV_DONTNEED, i, min(TAM_TROZO, len(vista) - i))
+        return h.digest()
+
+def resumen_archivo(archivo: Union[Ruta, BinaryIO], algoritmo: str, usar_mmap: bool = True) -> bytes:
+    """
+    Resumen de un archivo (ruta o binario abierto, desde su posición actual hasta el final).
+    Con usar_mmap se mapea; si no se puede, lectura con búfer (hashlib.file_digest).
+    """
+    if isinstance(archivo, (str, os.PathLike)):
+        with open(archivo, "rb") as f:
+            return resumen_archivo(f, algoritmo, usar_mmap)
+    if usar_mmap:
+        digest = _resumen_mapeado(archivo, algoritmo)
+        if digest is not None:
+            return digest
+    return hashlib.file_digest(archivo, lambda: _nuevo(algoritmo)).digest()
+
+def resumenes_archivos(rutas: Sequence[Ruta], algoritmo: str, hilos: Optional[int] = None,
+                       usar_mmap: bool = True) -> List[bytes]:
+    """Resúmenes de varios archivos en paralelo (hilos: hashlib trabaja sin el GIL)."""
+    if hilos == 1 or len(rutas) <= 1:
+        return [resumen_archivo(r, algoritmo, usar_mmap) for r in rutas]
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        return list(pool.map(lambda r: resumen_archivo(r, algoritmo, usar_mmap), rutas))
+
+def resumen_a_entero(digest: bytes) -> int:
+    return int.from_bytes(digest, "big")
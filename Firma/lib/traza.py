@@ -0,0 +1,90 @@
+# archivo: traza.py
+# Traza "paso a paso" separada del cálculo.
+# Las primitivas emiten pasos estructurados (plantilla + datos); solo se formatean
+# si hay un destino conectado. Por defecto la traza es silenciosa y emitir() no
+# convierte ningún entero a decimal.
+from contextlib import contextmanager
+from string import Formatter
+from typing import Any, Dict, List, NamedTuple, Optional
+
+class Paso(NamedTuple):
+    plantilla: str          # formato str.format con campos con nombre
+    datos: Dict[str, Any]   # valores crudos (enteros grandes sin formatear)
+
+    def texto(self) -> str:
+        return self.plantilla.format(**self.datos)
+
+class TrazaConsola:
+    """Imprime cada paso en consola, igual que las demos originales."""
+    def registrar(self, paso: Paso) -> None:
+        print(paso.texto())
+
+class TrazaLista:
+    """Acumula los pasos sin formatearlos (útil para inspeccionar o renderizar después)."""
+    def __init__(self) -> None:
+        self.pasos: List[Paso] = []
+
+    def registrar(self, paso: Paso) -> None:
+        self.pasos.append(paso)
+
+_ESCAPES_LATEX = {
+    "\\": r"\textbackslash{}", "{": r"\{", "}": r"\}", "#": r"\#", "$": r"\$",
+    "%": r"\%", "&": r"\&", "_": r"\_", "^": r"\^{}", "~": r"\~{}",
+}
+
+def _escapar_latex(texto: str) -> str:
+    return "".join(_ESCAPES_LATEX.get(c, c) for c in texto)
+
+def _valor_latex(valor: Any, spec: str) -> str:
+    if isinstance(valor, str):
+        return _escapar_latex(format(valor, spec))
+    return rf"\({format(valor, spec)}\)"
+
+class TrazaLatex:
+    """Renderiza cada paso como una línea LaTeX: texto escapado y valores en modo matemático."""
+    def __init__(self) -> None:
+        self.lineas: List[str] = []
+
+    def registrar(self, paso: Paso) -> None:
+        partes = []
+        for literal, campo, spec, conv in Formatter().parse(paso.plantilla):
+            partes.append(_escapar_latex(literal))
+            if campo is not None:
+                valor = paso.datos[campo]
+                if conv:
+                    valor = repr(valor) if conv == "r" else str(valor)
+                partes.append(_valor_latex(valor, spec or ""))
+        linea = "".join(partes).strip("\n")
+        if linea:
+            self.lineas.append(linea)
+
+    def documento(self) -> str:
+        cuerpo = " \\\\\n".join(self.lineas)
+        return f"\\begin{{flushleft}}\n{cuerpo}\n\\end{{flushleft}}"
+
+# --- destino actual (None = silenciosa) ---
+_destino: Optional[Any] = None
+
+def usar_traza(destino) -> Optional[Any]:
+    """Conecta un destino (TrazaConsola, TrazaLatex, ...) o None para silenciar. Devuelve el anterior."""
+    global _destino
+    anterior = _destino
+    _destino = destino
+    return anterior
+
+@contextmanager
+def con_traza(destino):
+    """Conecta un destino solo dentro del bloque with."""
+    anterior = usar_traza(destino)
+    try:
+        yield destino
+    finally:
+        usar_traza(anterior)
+
+def traza_activa() -> bool:
+    """Permite saltarse preparativos costosos de la traza cuando nadie la escucha."""
+    return _destino is not None
+
+def emitir(plantilla: str, **datos) -> None:
+    if _destino is not None:
+        _destino.registrar(Paso(plantilla, datos))
@@ -1,13 +1,9 @@
 # archivo: tabla_base0.py
+from Cifrados.lib.alfabeto import ALFABETO_ES
 
 def generar_simbolos():
-    # a hasta n
-    simbolos = [chr(c) for c in range(ord('a'), ord('n') + 1)]
-    # ñ
-    simbolos.append('ñ')
-    # o hasta z
-    simbolos += [chr(c) for c in range(ord('o'), ord('z') + 1)]
-    return simbolos
+    # a..n, ñ, o..z: el mismo alfabeto de 27 símbolos del códec compartido, en minúsculas
+    return list(ALFABETO_ES.lower())
 
 def imprimir_tabla(simbolos_por_linea=8):
     simbolos = generar_simbolos()